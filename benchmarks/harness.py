@@ -0,0 +1,126 @@
+# Measuring, storing and comparing benchmark results
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.10  # a 10% drop in throughput or growth in p95 latency or peak memory is a regression
+# ...but only if the run also got this much slower or bigger, so timer noise on tiny runs is not flagged
+DEFAULT_MIN_DELTA_MS = 1.0
+DEFAULT_MIN_DELTA_MB = 1.0
+
+
+# Define function to get a percentile of a list of values, like numpy's default (linear) method
+def percentile(values, percent):
+    return float(np.percentile(values, percent)) if values else 0.0
+
+
+# Define function to measure one operation
+def measure(case, size, prepare, rows, repeats=5, trace_memory=True):
+    """
+    Runs an operation repeats times and returns its result record.
+    - prepare(): untimed setup for one run, returns the operation to time (a callable)
+    - rows: the number of rows (or items) one run processes, for throughput
+    Anything the operation prints goes to os.devnull, so terminal speed is not measured.
+    Peak memory comes from one extra run under tracemalloc, which is slower and not timed.
+    """
+    seconds = []
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(repeats):
+            operation = prepare()
+            started = time.perf_counter()
+            operation()
+            seconds.append(time.perf_counter() - started)
+        peak = None
+        if trace_memory:
+            operation = prepare()
+            tracemalloc.start()
+            try:
+                operation()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    median = percentile(seconds, 50)
+    return {
+        'case': case,
+        'size': size,
+        'rows': rows,
+        'repeats': repeats,
+        'seconds': seconds,
+        'rows_per_sec': rows / median if median else 0.0,
+        'p50_ms': median * 1000,
+        'p95_ms': percentile(seconds, 95) * 1000,
+        'p99_ms': percentile(seconds, 99) * 1000,
+        'max_ms': max(seconds) * 1000,
+        'peak_memory_mb': None if peak is None else peak / 2**20,
+    }
+
+
+# Define function to describe the machine, so results from different machines are not mixed up
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'argv': sys.argv[1:],
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+# Define function to save results as JSON
+def save_results(path, results, seed):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'environment': environment(), 'seed': seed, 'results': results}, file, indent=2)
+        file.write('\n')
+
+
+# Define function to load results saved by save_results
+def load_results(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+# Define function to flag regressions against a baseline
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_delta_ms=DEFAULT_MIN_DELTA_MS,
+            min_delta_mb=DEFAULT_MIN_DELTA_MB):
+    """
+    Compares results with the results of a baseline run, matched by (case, size).
+    Returns a list of (case, size, metric, baseline value, new value, change) for every metric
+    that got worse by more than threshold: lower rows_per_sec, higher p95_ms or peak_memory_mb.
+    A relative change alone is not enough: the median (rows_per_sec) or p95 time must also have
+    grown by at least min_delta_ms, and peak memory by at least min_delta_mb. A sub-millisecond
+    case can swing by more than 10% from one run to the next without any code change.
+    Cases missing from either run are ignored.
+    """
+    previous = {(result['case'], result['size']): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get((result['case'], result['size']))
+        if old is None:
+            continue
+        for metric, higher_is_better in (('rows_per_sec', True), ('p95_ms', False), ('peak_memory_mb', False)):
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if (-change if higher_is_better else change) <= threshold:
+                continue
+            if metric == 'rows_per_sec':
+                # Throughput is rows / median seconds, so compare the median times it stands for
+                delta = (result['rows'] / after - old['rows'] / before) * 1000 if after else float('inf')
+            else:
+                delta = after - before
+            if delta >= (min_delta_mb if metric == 'peak_memory_mb' else min_delta_ms):
+                regressions.append((result['case'], result['size'], metric, before, after, change))
+    return regressions
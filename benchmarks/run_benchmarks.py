@@ -0,0 +1,181 @@
+# Benchmark suite for the hot paths of the repository
+#
+#   python benchmarks/run_benchmarks.py --sizes 10000 100000 --output results.json
+#   python benchmarks/run_benchmarks.py --baseline results.json    # flags regressions, exit code 1
+import argparse
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from dateutil.relativedelta import relativedelta
+from datetime import datetime, timedelta
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('week11/assignment2', 'final_project', 'week10', 'week2'):
+    sys.path.insert(0, os.path.join(REPO, folder))
+
+from assignment2_grouph import CustomerManager  # noqa: E402
+from dice import ArrayDice, Dice, Die  # noqa: E402
+from draw_grid import draw_grid  # noqa: E402
+from finalproject_groupH import ToDoListManager  # noqa: E402
+from harness import (DEFAULT_MIN_DELTA_MB, DEFAULT_MIN_DELTA_MS, DEFAULT_THRESHOLD, compare,  # noqa: E402
+                     load_results, measure, save_results)
+from synthetic import DATE_SPAN_DAYS, FIRST_DATE, write_customers, write_tasks  # noqa: E402
+
+DEFAULT_SIZES = [10**4, 10**5]
+GRID_COLS = 10
+
+
+# Define functions to get (and generate once) the synthetic data files
+def customers_file(directory, size, seed):
+    path = os.path.join(directory, f'customers-{size}-{seed}.csv')
+    return path if os.path.exists(path) else write_customers(path, size, seed)
+
+
+def tasks_file(directory, size, seed):
+    path = os.path.join(directory, f'tasks-{size}-{seed}.txt')
+    return path if os.path.exists(path) else write_tasks(path, size, seed)
+
+
+# Define function to get the months of inactivity that split the synthetic purchase dates in half
+def median_inactive_months():
+    middle = datetime.combine(FIRST_DATE + timedelta(days=DATE_SPAN_DAYS // 2), datetime.min.time())
+    age = relativedelta(datetime.now(), middle)
+    return age.years * 12 + age.months
+
+
+# Each case takes (size, data directory, seed) and returns (prepare, rows) for harness.measure
+def customers_load(size, directory, seed, backend='rows'):
+    path = customers_file(directory, size, seed)
+    return (lambda: lambda: CustomerManager(path, backend=backend)), size
+
+
+def customers_load_columnar(size, directory, seed):
+    return customers_load(size, directory, seed, backend='columnar')
+
+
+def customers_find_inactive(size, directory, seed, backend='rows'):
+    manager = CustomerManager(customers_file(directory, size, seed), backend=backend)
+    months = median_inactive_months()
+    return (lambda: lambda: manager.find_inactive_customers(months)), size
+
+
+def customers_find_inactive_columnar(size, directory, seed):
+    return customers_find_inactive(size, directory, seed, backend='columnar')
+
+
+def customers_rollup(size, directory, seed):
+    manager = CustomerManager(customers_file(directory, size, seed))
+    manager.rollup('month')  # the first report folds in the loaded rows, the timed ones only read the groups
+    return (lambda: lambda: manager.rollup('month')), size
+
+
+def todo_load_file(size, directory, seed):
+    manager = ToDoListManager(tasks_file(directory, size, seed), verbose=False)
+    return (lambda: lambda: manager.load_file(verbose=False)), size
+
+
+def todo_save_tasks(size, directory, seed):
+    path = os.path.join(directory, f'tasks-save-{size}-{seed}.txt')
+    with open(tasks_file(directory, size, seed), 'rb') as source, open(path, 'wb') as copy:
+        copy.write(source.read())  # save_tasks rewrites its file, so it gets its own copy
+    manager = ToDoListManager(path, verbose=False)
+
+    def prepare():
+        manager.is_modified = True
+        return manager.save_tasks
+    return prepare, size
+
+
+def dice_roll_all(size, directory, seed):
+    dice = Dice()
+    for _ in range(size):
+        dice.addDie(Die())
+    return (lambda: dice.rollAll), size
+
+
+def dice_roll_all_array(size, directory, seed):
+    dice = ArrayDice(size, seed=seed)
+    return (lambda: dice.rollAll), size
+
+
+def grid_draw(size, directory, seed):
+    def draw():
+        with open(os.devnull, 'w') as devnull:
+            draw_grid(size, GRID_COLS, devnull)
+    return (lambda: draw), size
+
+
+CASES = {
+    'customers.load_data': customers_load,
+    'customers.load_data_columnar': customers_load_columnar,
+    'customers.find_inactive_customers': customers_find_inactive,
+    'customers.find_inactive_customers_columnar': customers_find_inactive_columnar,
+    'customers.rollup': customers_rollup,
+    'todo.load_file': todo_load_file,
+    'todo.save_tasks': todo_save_tasks,
+    'dice.rollAll': dice_roll_all,
+    'dice.rollAll_array': dice_roll_all_array,
+    'grid.draw_grid': grid_draw,
+}
+
+
+# Define function to run the selected cases at every size
+def run(case_names, sizes, directory, seed=0, repeats=5, trace_memory=True):
+    results = []
+    for size in sizes:
+        for name in case_names:
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):  # setup messages are not results
+                prepare, rows = CASES[name](size, directory, seed)
+            result = measure(name, size, prepare, rows, repeats, trace_memory)
+            results.append(result)
+            memory = '-' if result['peak_memory_mb'] is None else f"{result['peak_memory_mb']:.1f}"
+            print(f"{name:<44} {size:>10} {result['rows_per_sec']:>14,.0f} {result['p50_ms']:>10.1f} "
+                  f"{result['p95_ms']:>10.1f} {memory:>10}", flush=True)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of the repository.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='rows of synthetic data per run, e.g. 10000 1000000 10000000')
+    parser.add_argument('--cases', nargs='+', default=list(CASES),
+                        help='case names or prefixes, e.g. customers todo.save_tasks')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', help='keep the generated data here and reuse it (default: a temporary directory)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative change that counts as a regression (default 0.10)')
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help='smallest slowdown in milliseconds that counts as a regression (default 1.0)')
+    parser.add_argument('--min-delta-mb', type=float, default=DEFAULT_MIN_DELTA_MB,
+                        help='smallest peak memory growth in MB that counts as a regression (default 1.0)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the extra run that measures peak memory')
+    args = parser.parse_args()
+
+    case_names = [name for name in CASES if any(name.startswith(case) for case in args.cases)]
+    unknown = [case for case in args.cases if not any(name.startswith(case) for name in CASES)]
+    if unknown or not case_names:
+        parser.error(f"unknown cases: {', '.join(unknown)}. Choose from: {', '.join(CASES)}")
+
+    print(f"{'Case':<44} {'Size':>10} {'Rows/s':>14} {'p50 ms':>10} {'p95 ms':>10} {'Peak MB':>10}")
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+        results = run(case_names, args.sizes, args.data_dir, args.seed, args.repeats, not args.no_memory)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            results = run(case_names, args.sizes, directory, args.seed, args.repeats, not args.no_memory)
+
+    if args.output:
+        save_results(args.output, results, args.seed)
+        print(f"Results saved to {args.output}")
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.threshold,
+                              args.min_delta_ms, args.min_delta_mb)
+        for case, size, metric, before, after, change in regressions:
+            print(f"REGRESSION {case} size={size}: {metric} {before:,.2f} -> {after:,.2f} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
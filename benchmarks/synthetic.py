@@ -0,0 +1,73 @@
+# Synthetic data generators for the benchmarks, at any size and always the same for a given seed
+import csv
+from datetime import date, timedelta
+
+import numpy as np
+
+CUSTOMER_FIELDS = ['CustomerID', 'Name', 'Email', 'PurchaseAmount', 'PurchaseDate']
+CHUNK_ROWS = 100000  # rows generated and written per batch, so memory does not grow with the file
+FIRST_DATE = date(2021, 1, 1)  # purchase dates span FIRST_DATE .. FIRST_DATE + DATE_SPAN_DAYS
+DATE_SPAN_DAYS = 4 * 365
+EMAIL_DOMAINS = ['example.com', 'mail.com', 'shop.org', 'corp.net']
+TASK_WORDS = ['buy', 'call', 'email', 'fix', 'write', 'review', 'plan', 'clean', 'pay', 'book',
+              'groceries', 'report', 'dentist', 'invoice', 'car', 'garden', 'meeting', 'tickets']
+
+
+# Define function to write a customer CSV with the schema of Costum_data.csv
+def write_customers(path, rows, seed=0, invalid_rate=0.01):
+    """
+    Writes rows customers like Costum_data.csv:
+    CustomerID,Name,Email,PurchaseAmount,PurchaseDate
+    About invalid_rate of the rows are broken in one of the ways CustomerManager rejects
+    (bad email, negative amount, impossible date), so the error paths are measured too.
+    Returns path.
+    """
+    rng = np.random.default_rng(seed)
+    dates = [(FIRST_DATE + timedelta(days=day)).isoformat() for day in range(DATE_SPAN_DAYS)]
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CUSTOMER_FIELDS)
+        for start in range(0, rows, CHUNK_ROWS):
+            count = min(CHUNK_ROWS, rows - start)
+            amounts = rng.integers(1, 2000, size=count).tolist()
+            days = rng.integers(0, DATE_SPAN_DAYS, size=count).tolist()
+            domains = rng.integers(0, len(EMAIL_DOMAINS), size=count).tolist()
+            broken = (rng.random(count) < invalid_rate).tolist()
+            kinds = rng.integers(0, 3, size=count).tolist()
+            batch = []
+            for offset in range(count):
+                number = start + offset + 1
+                email = f"customer{number}@{EMAIL_DOMAINS[domains[offset]]}"
+                amount = amounts[offset]
+                purchase_date = dates[days[offset]]
+                if broken[offset]:
+                    kind = kinds[offset]
+                    if kind == 0:
+                        email = email.replace('@', '')
+                    elif kind == 1:
+                        amount = -amount
+                    else:
+                        purchase_date = purchase_date[:5] + '13-32'
+                batch.append((number, f"Customer_{number}", email, amount, purchase_date))
+            writer.writerows(batch)
+    return path
+
+
+# Define function to write a task file in the tasks.txt format
+def write_tasks(path, rows, seed=0, completed_rate=0.3):
+    """
+    Writes rows tasks as 'description | status' lines, like tasks.txt.
+    Descriptions are three words and a number; about completed_rate of the tasks are Completed.
+    Returns path.
+    """
+    rng = np.random.default_rng(seed)
+    with open(path, 'w') as file:
+        for start in range(0, rows, CHUNK_ROWS):
+            count = min(CHUNK_ROWS, rows - start)
+            words = rng.integers(0, len(TASK_WORDS), size=(count, 3))
+            completed = (rng.random(count) < completed_rate).tolist()
+            file.writelines(
+                f"{TASK_WORDS[first]} {TASK_WORDS[second]} {TASK_WORDS[third]} {start + offset + 1}"
+                f" | {'Completed' if completed[offset] else 'Pending'}\n"
+                for offset, (first, second, third) in enumerate(words.tolist()))
+    return path
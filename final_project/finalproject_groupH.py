@@ -1,80 +1,408 @@
+import argparse
+import io
+import locale
 import os
+import sys
+import threading
+import atexit
+import time
+from task_batch import read_commands
+from task_database import TaskDatabase
+from task_journal import TaskJournal
+from task_store import TaskStore
+from task_watch import FileState, TaskFileWatcher, synchronized
+# The metrics module is shared with the other manager; appended so it never shadows a local module
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from instrumentation import METRICS, instrumented  # noqa: E402
+
+PAGE_SIZE = 20 # Number of tasks shown per page
 
 # Initialize the class
 class ToDoListManager:
-    def __init__(self, filepath):
+    def __init__(self, filepath, journal=False, compact_threshold=1000, shared=False, verbose=True):
         self.filepath = filepath
-        self.tasks = [] # Initialize an empty task list
+        self.tasks = TaskStore() # Initialize an empty task list
         self.is_modified = False # Track whether tasks have been modified
-        self.load_file() # load tasks from file if it exists
+        # In journal mode, saves append the pending operations to '<filepath>.journal'
+        # and the task file is only rewritten once compact_threshold operations have piled up
+        self.journal = TaskJournal(filepath) if journal else None
+        self.compact_threshold = compact_threshold
+        # In shared mode, tasks live in an SQLite database '<filepath>.db' that several processes
+        # can use at once; saves apply the pending operations in one transaction, so none are lost
+        if journal and shared:
+            raise ValueError("Choose either journal or shared mode, not both.")
+        self.database = TaskDatabase(filepath + ".db") if shared else None
+        self.first_new_id = 1 # Local ID of the first task added since the database was last read
+        self.skipped_operations = [] # Operations skipped at the last shared save
+        self.pending_operations = [] # Operations not yet written to the journal or database
+        self.last_save_bytes = 0 # Bytes written by the last save, for the metrics
+        self.file_state = FileState() # The task file as last loaded or saved, to detect outside changes
+        self.conflict = False # Set when the file changed on disk while there were unsaved changes
+        self.lock = threading.RLock() # Lets a TaskFileWatcher refresh the tasks from another thread
+        self.watcher = None
+        self.load_file(verbose) # load tasks from file if it exists
 
     # Define function to load file
-    def load_file(self):
+    @synchronized
+    @instrumented("todo.load_file", rows=lambda self, result: len(self.tasks),
+                  bytes_read=lambda self, *args, **kwargs: self.stored_bytes())
+    def load_file(self, verbose=True):
         """
         This is the function to load tasks from the file specified in self.filepath.
-        Tasks are represented as dictionaires with keys 'description' and 'status'. 
-        These dictionaries are stored in a list, which maintains the order of tasks as they are added.
+        Tasks are represented as Task objects with a stable 'id', a 'description' and a 'status'.
+        They are stored in a TaskStore, which maintains the order of tasks as they are added.
+        IDs are given in file order, so the same file (and journal) always gives the same IDs.
+        Parameters:
+        - verbose (bool): print welcome, warning and status messages.
         """
-        print("Welcome to your To-Do List Manager!")
+        log = print if verbose else (lambda *args: None)
+        log("Welcome to your To-Do List Manager!")
 
         try:
-            # Load tasks from the file
-            with open(self.filepath, "r") as file:
-                self.tasks = []
-                for line in file:
-                    task_data = line.strip().split(" | ")
-                    if len(task_data) == 2:
-                        task, status = task_data
-                        self.tasks.append({"description": task, "status": status})
-                    else: 
-                        print(f"Warning! Skipping broken line in the file: {line}")
+            if self.database is not None:
+                self.load_database(log)
+            else:
+                # Load tasks from the file
+                data, self.file_state = FileState.read(self.filepath)
+                self.tasks = TaskStore()
+                self.parse_lines(data, log)
+            self.pending_operations = []
+            self.is_modified = False
+            self.conflict = False
+            if self.journal is not None:
+                self.replay_journal(data, log)
             if not self.tasks:
-                print("No tasks found in the file. Starting with an empty task list.")
+                log("No tasks found in the file. Starting with an empty task list.")
             else:
-                print("Tasks loaded successfully.")
+                log("Tasks loaded successfully.")
+        except FileNotFoundError as e:
+            self.file_state = FileState()
+            log(f"Error loading tasks: {e}")
         except Exception as e:
-            print(f"Error loading tasks: {e}")
+            log(f"Error loading tasks: {e}")
+
+    # Define function to add the tasks found in lines of the task file
+    def parse_lines(self, data, log=print):
+        """
+        Parses task file content in the ' | ' format and adds the tasks to the list.
+        Parameters:
+        - data (bytes): raw content of the task file, or the part appended since the last read.
+        Returns:
+        - int: the number of tasks added
+        """
+        added = 0
+        text = data.decode(locale.getpreferredencoding(False))
+        for line in io.StringIO(text, newline=None):
+            task_data = line.strip().split(" | ")
+            if len(task_data) == 2:
+                task, status = task_data
+                self.tasks.add(task, status)
+                added += 1
+            else: 
+                log(f"Warning! Skipping broken line in the file: {line}")
+        return added
+
+    # Define function to load tasks from the shared database
+    def load_database(self, log=print):
+        """
+        Loads the tasks from the shared database, with the IDs the database gave them.
+        The first time, the database is filled with the tasks of the text task file, if there is one;
+        the import is recorded in the database, so it never happens again.
+        """
+        if not self.database.is_imported():
+            self.tasks = TaskStore()
+            if os.path.exists(self.filepath):
+                with open(self.filepath, "rb") as file:
+                    self.parse_lines(file.read(), log)
+            self.database.import_tasks([(task.description, task.status) for task in self.tasks])
+        self.tasks = TaskStore()
+        for task_id, description, status in self.database.read():
+            self.tasks.add(description, status, task_id)
+        self.first_new_id = self.tasks.next_id
+
+    # Define function to get the size of the task file and journal as last read or written
+    def stored_bytes(self):
+        return self.file_state.size + (self.journal.state.size if self.journal is not None else 0)
+
+    # Define function to check whether another process changed the task file
+    def has_external_changes(self):
+        """
+        Returns:
+        - bool: 'True' if the task file (or its journal or database) differs from what was last loaded or saved
+        """
+        if self.database is not None:
+            return self.database.changed()
+        if self.file_state.compare(self.filepath) != "unchanged":
+            return True
+        return self.journal is not None and self.journal.state.compare(self.journal.path) != "unchanged"
+
+    # Define function to reload tasks, reading only what changed
+    @synchronized
+    @instrumented("todo.reload_tasks", rows=lambda self, result: len(self.tasks))
+    def reload_tasks(self, verbose=True, discard_changes=False):
+        """
+        Reload tasks from the file without re-reading it when possible:
+        - nothing changed on disk: nothing is read
+        - lines were appended to the task file (or operations to the journal): only those are read
+        - the file was rewritten: it is loaded again from the start
+        If there are unsaved changes and the file changed on disk, the reload is skipped and a
+        conflict is reported, unless discard_changes is True.
+        Returns:
+        - str: 'unchanged', 'appended', 'full' or 'conflict'
+        """
+        log = print if verbose else (lambda *args: None)
+        if self.is_modified:
+            if self.has_external_changes() and not discard_changes:
+                self.conflict = True
+                log("Warning! The task file was changed on disk and you have unsaved changes. Reload skipped.")
+                return "conflict"
+            # Reloading replaces unsaved changes, as a full reload always has
+            self.load_file(verbose)
+            return "full"
+
+        if self.database is not None:
+            # Shared mode: the database only tells whether it changed, so changes mean a full read
+            if not self.database.changed():
+                log("Tasks are already up to date.")
+                return "unchanged"
+            self.load_file(verbose)
+            return "full"
+        base_change = self.file_state.compare(self.filepath)
+        if self.journal is None and base_change == "appended":
+            added = self.parse_lines(self.file_state.read_appended(self.filepath), log)
+            log(f"Loaded {added} new task(s) from the file.")
+            return "appended"
+        if self.journal is not None and base_change == "unchanged":
+            operations = self.journal.read_new()
+            if operations == []:
+                log("Tasks are already up to date.")
+                return "unchanged"
+            if operations is not None:
+                for operation, argument in operations:
+                    self.apply_operation(operation, argument)
+                log(f"Applied {len(operations)} new change(s) from the journal.")
+                return "appended"
+        elif base_change == "unchanged":
+            log("Tasks are already up to date.")
+            return "unchanged"
+        self.load_file(verbose)
+        return "full"
+
+    # Define function to refresh tasks from the file in the background
+    @synchronized
+    def refresh(self):
+        """
+        Called by a TaskFileWatcher. Quietly picks up changes made by other processes,
+        or records a conflict if they happened while there are unsaved changes.
+        """
+        if self.is_modified:
+            if self.has_external_changes():
+                self.conflict = True
+        else:
+            self.reload_tasks(verbose=False)
+
+    # Define function to start watching the task file
+    def watch(self, interval=2.0):
+        """
+        Starts a background thread that refreshes the tasks when the file changes on disk.
+        Parameters:
+        - interval (float): seconds between two checks of the file.
+        """
+        if self.watcher is None:
+            self.watcher = TaskFileWatcher(self, interval).start()
+        return self.watcher
+
+    # Define function to stop watching the task file
+    def stop_watching(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    # Define function to replay the journal on top of the tasks loaded from the file
+    def replay_journal(self, data, log=print):
+        """
+        Applies the operations recorded in the journal, in order, to self.tasks.
+        A journal written for another version of the task file is not replayed; it is moved aside
+        with a warning, so its changes can still be recovered by hand.
+        Parameters:
+        - data (bytes): the content of the task file the tasks were loaded from.
+        """
+        operations, stale = self.journal.read(data)
+        if self.journal.base_ids is not None:
+            # The file was compacted: give its tasks the IDs they had, which the journal refers to
+            try:
+                self.tasks.renumber(*self.journal.base_ids)
+            except ValueError:
+                self.journal.stale_path = self.journal.set_aside()
+                self.journal.base_ids = None
+                operations, stale = [], True
+        if stale:
+            log("Warning! The journal belongs to another version of the task file and was not replayed. "
+                f"It was kept as '{self.journal.stale_path}'.")
+        for operation, argument in operations:
+            if not self.apply_operation(operation, argument):
+                log(f"Warning! Skipping invalid journal entry: {operation} {argument}")
+
+    # Define function to apply one journal operation
+    def apply_operation(self, operation, argument):
+        """
+        Applies an 'add', 'remove' or 'complete' operation without printing or marking changes.
+        'remove' and 'complete' take a task ID.
+        Returns:
+        - bool: 'True' if the operation was applied, 'False' if it was invalid
+        """
+        if operation == "add":
+            self.tasks.add(argument)
+            return True
+        task = self.tasks.get(int(argument)) if argument.isdigit() else None
+        if task is None:
+            return False
+        if operation == "remove":
+            self.tasks.remove(task.id)
+            return True
+        if operation == "complete":
+            self.tasks.set_status(task.id, "Completed")
+            return True
+        return False
+
+    # Define function to record an operation for the journal or the shared database
+    def record_operation(self, operation, argument):
+        if self.journal is not None or self.database is not None:
+            self.pending_operations.append((operation, argument))
+
+    # Define function to write tasks in the ' | ' text format
+    def task_lines(self):
+        return [f"{task['description']} | {task['status']}\n" for task in self.tasks]
+
+    # Define function to export tasks to a text file
+    def export_tasks(self, path):
+        """
+        Writes the current tasks to path in the same ' | ' format as the task file,
+        whatever the storage mode.
+        """
+        with open(path, "w") as file:
+            file.writelines(self.task_lines())
+        print(f"Tasks exported successfully to '{path}'.")
 
     # Define function to save tasks
-    def save_tasks(self):
+    @synchronized
+    @instrumented("todo.save_tasks", rows=lambda self, result: len(self.tasks),
+                  bytes_written=lambda self, *args, **kwargs: self.last_save_bytes)
+    def save_tasks(self, force=False):
         """
         This is a function to save the current tasks to the file specified in self.filepath.
         Each task is stored in a dictionary with the following keys:
         - 'description': the task's name from user's input.
         - 'status': status of the task: 'completed' or 'pending'.
         These dictionaries are stored in a list, which maintains the order of tasks as they are added.
+        If the file was changed on disk since it was loaded, nothing is saved and a conflict is
+        reported, unless force is True, in which case the file is overwritten with the current tasks.
+        In shared mode there are no conflicts: the changes are applied on top of the other users' changes.
         """
+        self.last_save_bytes = 0
         if self.is_modified:
+            if not force and self.database is None and self.has_external_changes():
+                self.conflict = True
+                print("Warning! The task file was changed on disk since it was loaded. "
+                      "Your changes were not saved to avoid overwriting the other changes.")
+                return
             try:
-                with open(self.filepath, "w") as file:
-                    for task in self.tasks:
-                        file.write(f"{task['description']} | {task['status']}\n")
-                print(f"Tasks saved successfully to '{self.filepath}'.")
+                if self.database is not None:
+                    # Shared mode: apply the changes in one transaction, then read back every user's tasks
+                    self.skipped_operations = self.database.apply(self.pending_operations, self.first_new_id)
+                    self.pending_operations = []
+                    self.load_database()
+                    if self.skipped_operations:
+                        print(f"Warning! {len(self.skipped_operations)} change(s) skipped because "
+                              "another user removed those tasks.")
+                elif self.journal is not None:
+                    # Journal mode: append only the changes, compact once the journal grows too long.
+                    # A forced save rewrites everything, since the journal on disk no longer matches.
+                    self.last_save_bytes = self.journal.append(self.pending_operations)
+                    self.pending_operations = []
+                    if force or self.journal.count >= self.compact_threshold:
+                        # The journal header keeps the task IDs, so IDs stay stable across compactions
+                        self.last_save_bytes += self.journal.compact(
+                            self.task_lines(), [task.id for task in self.tasks], self.tasks.next_id)
+                else:
+                    with open(self.filepath, "w") as file:
+                        for task in self.tasks:
+                            file.write(f"{task['description']} | {task['status']}\n")
+                    self.last_save_bytes = os.path.getsize(self.filepath)
+                self.file_state = FileState.of_file(self.filepath)
+                saved_to = self.filepath if self.database is None else self.database.path
+                print(f"Tasks saved successfully to '{saved_to}'.")
                 self.is_modified = False  # Reset modified flag after tasks are saved
+                self.conflict = False
             except Exception as e: 
                 print(f"Error saving tasks: {e}")
         else:
             print("No changes to save. Please make sure to modify the current tasks first.")
 
     # Define function to view tasks
-    def view_tasks(self):
+    @synchronized
+    @instrumented("todo.view_tasks", rows=lambda self, result: result)
+    def view_tasks(self, page_size=None, offset=0, status=None):
         """
-        Displays all tasks in the current task list.
+        Displays tasks from the current task list, one page at a time.
         The tasks are displayed in the order they were added to the list.
-        Each task is represented by its 'description' and 'status'.
+        Each task is represented by its number, 'description' and 'status'.
+        Parameters:
+        - page_size (int): the number of tasks per page, None shows every task from offset.
+        - offset (int): the number of tasks to skip before the page starts.
+        - status (str): 'Pending' or 'Completed' to show only tasks with that status, None shows all.
+        The numbers shown are always the task numbers in the full list, so they can be used
+        to remove or complete a task. The page is written to the screen in a single write.
+        Returns:
+        - int: the number of tasks matching the status filter
         """
-        if not self.tasks:
-            print("No tasks available. Please make sure to add tasks first. ")
+        stop = None if page_size is None else offset + page_size
+        if status is None:
+            tasks = self.tasks.view()
+            total, page = len(tasks), tasks[offset:stop]
         else:
-            print("\nCurrent Tasks:")
-            # Print headers according to max description length
-            max_desc_len = max(len(task["description"]) for task in self.tasks)
-            print(f"{'No.':<5} {'Description':<{max_desc_len}} {'Status':<10}")
-            print("-" * (max_desc_len + 15))
-            for index, task in enumerate(self.tasks, start=1):
-                print(f"{index:<5} {task['description']:<{max_desc_len}} {task['status']:<10}")
+            # The status index is in display order, so only the page's IDs become Task objects
+            total = self.tasks.index.count(status)
+            page = self.tasks.tasks_for_ids(self.tasks.index.ids_with_status(status, offset, stop))
+        if not total:
+            if status is None:
+                print("No tasks available. Please make sure to add tasks first. ")
+            else:
+                print(f"No {status.lower()} tasks.")
+            return 0
+        # Column width is kept up to date by the task store instead of being recomputed here
+        max_desc_len = self.tasks.max_description_length
+        lines = ["\nCurrent Tasks:",
+                 f"{'No.':<5} {'Description':<{max_desc_len}} {'Status':<10}",
+                 "-" * (max_desc_len + 15)]
+        for position, task in enumerate(page, start=offset + 1):
+            number = position if status is None else self.tasks.position_of(task)
+            lines.append(f"{number:<5} {task.description:<{max_desc_len}} {task.status:<10}")
+        if len(page) < total:
+            lines.append(f"Showing {offset + 1}-{offset + len(page)} of {total} tasks.")
+        sys.stdout.write("\n".join(lines) + "\n")
+        return total
+
+    # Define function to browse tasks page by page
+    def browse_tasks(self, status=None):
+        """
+        Shows the first page of tasks and lets the user choose other pages by number.
+        Parameters:
+        - status (str): 'Pending' or 'Completed' to browse only tasks with that status, None browses all.
+        """
+        total = self.view_tasks(PAGE_SIZE, 0, status)
+        pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+        while pages > 1:
+            answer = input(f"Enter page number (1-{pages}) to view, or press Enter to return: ").strip()
+            if not answer:
+                break
+            if answer.isdigit() and 1 <= int(answer) <= pages:
+                self.view_tasks(PAGE_SIZE, (int(answer) - 1) * PAGE_SIZE, status)
+            else:
+                print(f"Error! Please choose a page between 1 and {pages}.")
 
     # Define function to add tasks
+    @synchronized
     def add_task(self, description):
         """
         Adds a new task to the task list with a 'Pending' status.
@@ -83,12 +411,14 @@ class ToDoListManager:
         After a task is added to the list with status "Pending", the modified flag is set to True, 
         and the program will prompt a success message that the task is added.
         """
-        self.tasks.append({"description": description, "status": "Pending"})
+        self.tasks.add(description)
+        self.record_operation("add", description)
         self.is_modified = True 
         print(f"Success! Task '{description}' added.")
         print("To save this task to the file, please choose option 5 (Save Tasks).")
 
     # Define function to remove tasks
+    @synchronized
     def remove_task(self, index):
         """
         Remove a task from the task list based on its index.
@@ -99,15 +429,13 @@ class ToDoListManager:
         If the task index is invalid, the program will prompt an error message.
         """
         if 0 <= index < len(self.tasks):
-            removed_task = self.tasks.pop(index)
-            self.is_modified = True
-            print(f"Success! Task '{removed_task['description']}' removed.")
-            print("To remove this task from the file, please choose option 5 (Save Tasks).")
+            self.remove_task_by_id(self.tasks[index].id)
         else:
             # Prompt error if invalid task number is chosen
             print("Error! Please choose a valid task number.")
 
     # Define function to mark tasks as completed
+    @synchronized
     def mark_task_completed(self, index):
         """
         Mark a task as 'Completed' based on its index.
@@ -119,15 +447,190 @@ class ToDoListManager:
         If the task index is invalid, the program will prompt an error message.
         """
         if 0 <= index < len(self.tasks):
-            description = self.tasks[index]["description"]
-            self.tasks[index]["status"] = "Completed"
-            self.is_modified = True
-            print(f"Success! Task '{description}' marked as completed.")
-            print("To save this status to the file, please choose option 5 (Save Tasks).")
+            self.mark_task_completed_by_id(self.tasks[index].id)
         else:
             # Prompt error if invalid task number is chosen
             print("Error! Please choose a valid task number.")
 
+    # Define function to remove a task by its ID
+    @synchronized
+    def remove_task_by_id(self, task_id):
+        """
+        Remove a task from the task list based on its stable ID, in O(1).
+        Parameters:
+        - task_id (int): the ID of the task to be removed.
+        Returns:
+        - bool: 'True' if the task was removed, 'False' if there is no task with this ID
+        """
+        removed_task = self.tasks.remove(task_id)
+        if removed_task is None:
+            print(f"Error! No task with ID {task_id}.")
+            return False
+        self.record_operation("remove", task_id)
+        self.is_modified = True
+        print(f"Success! Task '{removed_task.description}' removed.")
+        print("To remove this task from the file, please choose option 5 (Save Tasks).")
+        return True
+
+    # Define function to mark a task as completed by its ID
+    @synchronized
+    def mark_task_completed_by_id(self, task_id):
+        """
+        Mark a task as 'Completed' based on its stable ID, in O(1).
+        Parameters:
+        - task_id (int): the ID of the task to be marked as 'Completed'.
+        Returns:
+        - bool: 'True' if the task was found, 'False' if there is no task with this ID
+        """
+        task = self.tasks.get(task_id)
+        if task is None:
+            print(f"Error! No task with ID {task_id}.")
+            return False
+        self.tasks.set_status(task_id, "Completed")
+        self.record_operation("complete", task_id)
+        self.is_modified = True
+        print(f"Success! Task '{task.description}' marked as completed.")
+        print("To save this status to the file, please choose option 5 (Save Tasks).")
+        return True
+
+    # Define function to mark all tasks containing a keyword as completed
+    @synchronized
+    def complete_all_matching(self, keyword):
+        """
+        Mark every pending task whose description contains keyword (case-insensitive) as 'Completed'
+        in a single pass over the tasks.
+        Parameters:
+        - keyword (str): the text to look for in task descriptions.
+        Returns:
+        - int: the number of tasks marked as completed
+        """
+        keyword = keyword.lower()
+        completed = self.tasks.complete_where(lambda task: keyword in task.description.lower())
+        for task in completed:
+            self.record_operation("complete", task.id)
+        if completed:
+            self.is_modified = True
+        print(f"Success! {len(completed)} task(s) marked as completed.")
+        return len(completed)
+
+    # Define function to remove all completed tasks
+    @synchronized
+    def remove_all_completed(self):
+        """
+        Remove every task with status 'Completed', found through the status index.
+        Returns:
+        - int: the number of tasks removed
+        """
+        removed = self.tasks.remove_many(self.tasks.index.ids_with_status("Completed"))
+        for task in removed:
+            self.record_operation("remove", task.id)
+        if removed:
+            self.is_modified = True
+        print(f"Success! {len(removed)} completed task(s) removed.")
+        return len(removed)
+
+    # Define function to apply a batch of commands
+    @synchronized
+    @instrumented("todo.run_batch", rows=lambda self, result: sum(result.values()) if result else 0)
+    def run_batch(self, lines):
+        """
+        Applies batch commands (see task_batch.parse_command) as a single transaction:
+        every command is applied in memory without messages, then the tasks are saved once.
+        If a command is invalid or names a task that does not exist, nothing is saved and
+        the tasks are reloaded from the file, discarding any unsaved changes.
+        Parameters:
+        - lines: an iterable of command lines, e.g. an open file or sys.stdin.
+        Returns:
+        - dict: the number of tasks added, completed and removed, or None if the batch was not saved
+        """
+        counts = {"add": 0, "complete": 0, "remove": 0}
+        try:
+            for line_number, operation, argument in read_commands(lines):
+                if not self.apply_operation(operation, argument):
+                    raise ValueError(f"line {line_number}: no task with ID {argument}")
+                self.record_operation(operation, argument)
+                counts[operation] += 1
+        except ValueError as e:
+            print(f"Error! Batch not applied, {e}.")
+            self.load_file(verbose=False)
+            return None
+        if any(counts.values()):
+            self.is_modified = True
+            self.save_tasks()
+            if self.is_modified:  # the save failed or found a conflict
+                return None
+        return counts
+
+    # Define function to count tasks
+    @synchronized
+    def count_tasks(self, status=None):
+        """
+        Count tasks using the status index, without scanning the task list.
+        Parameters:
+        - status (str): 'Pending', 'Completed' or None to count every task.
+        Returns:
+        - int: the number of tasks
+        """
+        if status is None:
+            return len(self.tasks)
+        return self.tasks.index.count(status)
+
+    # Define function to list tasks with a status
+    @synchronized
+    def tasks_with_status(self, status):
+        """
+        Get the tasks with the given status from the status index, in display order.
+        Parameters:
+        - status (str): 'Pending' or 'Completed'.
+        Returns:
+        - list: the matching Task objects
+        """
+        return self.tasks.tasks_for_ids(self.tasks.index.ids_with_status(status))
+
+    # Define function to search tasks by keywords
+    @synchronized
+    @instrumented("todo.search_tasks", rows=lambda self, result: len(result))
+    def search_tasks(self, query):
+        """
+        Find tasks whose description contains every word of the query, using the token index.
+        A word ending with '*' is a prefix search, e.g. 'pres*' matches 'Presentation'.
+        Parameters:
+        - query (str): the keywords to look for.
+        Returns:
+        - list: the matching Task objects, in display order
+        """
+        return self.tasks.tasks_for_ids(self.tasks.index.search(query))
+
+    # Define function to display task counts
+    def show_task_counts(self):
+        """
+        Displays the number of pending, completed and total tasks.
+        """
+        print(f"Pending: {self.count_tasks('Pending')}")
+        print(f"Completed: {self.count_tasks('Completed')}")
+        print(f"Total: {self.count_tasks()}")
+
+    # Define function to display search results
+    def show_search_results(self, query):
+        """
+        Displays the tasks matching a keyword query, with their task numbers in the full list,
+        as in view_tasks, so they can be used to remove or complete a task.
+        Parameters:
+        - query (str): the keywords to look for.
+        """
+        with self.lock:
+            results = self.search_tasks(query)
+            numbers = [self.tasks.position_of(task) for task in results]
+        if not results:
+            print("No matching tasks found.")
+            return
+        max_desc_len = max(len(task.description) for task in results)
+        print(f"\n{len(results)} matching task(s):")
+        print(f"{'No.':<5} {'Description':<{max_desc_len}} {'Status':<10}")
+        print("-" * (max_desc_len + 15))
+        for number, task in zip(numbers, results):
+            print(f"{number:<5} {task.description:<{max_desc_len}} {task.status:<10}")
+
     # Define function to quit application
     def quit_application(self):
         """
@@ -156,6 +659,21 @@ class ToDoListManager:
 # Execute functions in Main Program
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="To-Do List Manager")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="apply the commands in FILE ('-' for stdin) without the menu, then save once")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="record timings and row counts and write them to FILE on exit (Prometheus text for .prom, else JSON)")
+    parser.add_argument("--profile", action="store_true", help="also run cProfile and print its report on exit")
+    parser.add_argument("--trace-memory", action="store_true", help="also record peak memory with tracemalloc")
+    args = parser.parse_args()
+    if args.metrics or args.profile or args.trace_memory:
+        METRICS.enable(profile=args.profile, trace_memory=args.trace_memory)
+        if args.metrics:
+            atexit.register(METRICS.export, args.metrics)
+        if args.profile:
+            atexit.register(lambda: sys.stderr.write(METRICS.profile_report()))
+
     # Define the file path for tasks.txt in the current directory
     file_path = "tasks.txt"
 
@@ -164,6 +682,21 @@ if __name__ == "__main__":
         with open(file_path, "w") as file:
             pass  # Create an empty tasks.txt file
 
+    if args.batch is not None:
+        # Batch mode: one operation per line or JSON line, one save, one summary line
+        manager = ToDoListManager(filepath=file_path, verbose=False)
+        started = time.perf_counter()
+        if args.batch == "-":
+            counts = manager.run_batch(sys.stdin)
+        else:
+            with open(args.batch) as batch_file:
+                counts = manager.run_batch(batch_file)
+        if counts is None:
+            sys.exit(1)
+        print(f"Batch done in {time.perf_counter() - started:.2f}s: {counts['add']} added, "
+              f"{counts['complete']} completed, {counts['remove']} removed, {len(manager.tasks)} tasks in total.")
+        sys.exit(0)
+
     # Initialize the ToDoListManager with a file path
     manager = ToDoListManager(filepath=file_path)
 
@@ -177,6 +710,8 @@ if __name__ == "__main__":
         print("5. Save Tasks")
         print("6. Reload Tasks from File")
         print("7. Quit")
+        print("8. Show Task Counts")
+        print("9. Search Tasks")
 
         try:
             # Prompt user to input their choice of actions
@@ -184,8 +719,8 @@ if __name__ == "__main__":
 
             # Execute functions based on user choice of actions
             if choice == 1:
-                # View all tasks
-                manager.view_tasks()
+                # View tasks one page at a time
+                manager.browse_tasks()
             elif choice == 2:
                 # Add a new task to the list
                 description = input("Enter task description: ").strip()
@@ -197,25 +732,40 @@ if __name__ == "__main__":
                 manager.add_task(description)              
             elif choice == 3:
                 # Remove a task from the list
-                manager.view_tasks() # Display current tasks for reference
+                manager.browse_tasks() # Display current tasks for reference
                 index = int(input("Enter task number to remove: ")) - 1 # -1 since we added 1 to index in the function
                 manager.remove_task(index)
             elif choice == 4:
-                # Mark a task as completed 
-                manager.view_tasks()
+                # Mark a task as completed, showing only the pending tasks
+                manager.browse_tasks("Pending")
                 index = int(input("Enter task number to mark as completed: ")) - 1 
                 manager.mark_task_completed(index)
             elif choice == 5:
                 # Save the modified tasks to the tasks.txt 
                 manager.save_tasks()
+                if manager.conflict:
+                    overwrite = input("Overwrite the file with your tasks? (y/n): ").strip().lower()
+                    if overwrite == 'y':
+                        manager.save_tasks(force=True)
             elif choice == 6:
-                # Reload tasks from the file, replacing the in-memory list
-                manager.load_file()
+                # Reload tasks from the file, reading only what changed since the last load
+                manager.reload_tasks()
+                if manager.conflict:
+                    discard = input("Discard your unsaved changes and reload? (y/n): ").strip().lower()
+                    if discard == 'y':
+                        manager.reload_tasks(discard_changes=True)
             elif choice == 7:
                 # Quit the application and prompt if there is any unsaved changes
                 if manager.quit_application():
                     break # Exit the loop and terminate the program if true
+            elif choice == 8:
+                # Show pending/completed counts from the status index
+                manager.show_task_counts()
+            elif choice == 9:
+                # Search task descriptions with the token index
+                query = input("Enter keywords to search (end a word with * to match a prefix): ").strip()
+                manager.show_search_results(query)
             else:
-                print("Invalid choice. Please select a number between 1 and 7.")
+                print("Invalid choice. Please select a number between 1 and 9.")
         except ValueError:
             print("Invalid input. Please enter a number.")
@@ -0,0 +1,65 @@
+import json
+
+BATCH_OPERATIONS = ("add", "complete", "remove")
+
+
+# Define function to parse one line of a batch
+def parse_command(line):
+    """
+    Parses one batch command, either as text or as a JSON object:
+    - 'add <description>'      or {"op": "add", "description": "<description>"}
+    - 'complete <task id>'     or {"op": "complete", "id": <task id>}
+    - 'remove <task id>'       or {"op": "remove", "id": <task id>}
+    Task IDs are the task numbers in the file when the batch starts; tasks added by the
+    batch continue the numbering, so a batch can add a task and then complete it.
+    Returns:
+    - tuple: (operation, argument), as recorded in the journal
+    Raises:
+    - ValueError: if the line is not a valid command
+    """
+    if line.startswith("{"):
+        try:
+            command = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON ({e.msg})") from None
+        if not isinstance(command, dict):
+            raise ValueError("a JSON command must be an object")
+        operation = command.get("op")
+        argument = command.get("description" if operation == "add" else "id")
+        argument = "" if argument is None else str(argument).strip()
+    else:
+        operation, _, argument = line.partition(" ")
+        argument = argument.strip()
+
+    if operation not in BATCH_OPERATIONS:
+        raise ValueError(f"unknown operation '{operation}', use one of {', '.join(BATCH_OPERATIONS)}")
+    if operation == "add":
+        if not argument:
+            raise ValueError("missing task description")
+        if " | " in argument:
+            raise ValueError("a task description cannot contain ' | '")
+        if "\n" in argument or "\r" in argument:
+            # Each task is one line of the task file and of the journal
+            raise ValueError("a task description cannot contain line breaks")
+    elif not argument.isdigit():
+        raise ValueError(f"'{argument}' is not a task ID")
+    return operation, argument
+
+
+# Define function to read the commands of a batch
+def read_commands(lines):
+    """
+    Yields (line number, operation, argument) for each command in lines (e.g. an open file
+    or sys.stdin), one command per line. Blank lines and lines starting with '#' are skipped.
+    Raises:
+    - ValueError: for the first invalid line, with its line number
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            operation, argument = parse_command(line)
+        except ValueError as e:
+            raise ValueError(f"line {line_number}: {e}") from None
+        yield line_number, operation, argument
@@ -0,0 +1,125 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from finalproject_groupH import ToDoListManager
+from task_database import TaskDatabase
+
+# Share of each operation in the mix, in the order add, complete, remove
+DEFAULT_MIX = (0.5, 0.3, 0.2)
+
+
+# Define function run by each worker process
+def run_worker(filepath, worker, operations, mix, save_every, seed):
+    """
+    Performs operations random add/complete/remove operations on a shared ToDoListManager,
+    saving every save_every operations.
+    Returns a dict with the worker's counts and its save latencies, for checking lost updates.
+    """
+    rng = random.Random(seed * 1000003 + worker)
+    counts = {"add": 0, "complete": 0, "remove": 0, "skipped": 0, "removed": 0}
+    latencies = []
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        manager = ToDoListManager(filepath, shared=True)
+
+        def save():
+            removes = sum(1 for operation, _ in manager.pending_operations if operation == "remove")
+            started = time.perf_counter()
+            manager.save_tasks()
+            latencies.append(time.perf_counter() - started)
+            skipped_removes = sum(1 for operation, _ in manager.skipped_operations if operation == "remove")
+            counts["removed"] += removes - skipped_removes
+            counts["skipped"] += len(manager.skipped_operations)
+
+        for number in range(operations):
+            operation = rng.choices(("add", "complete", "remove"), mix)[0]
+            if operation == "add" or not manager.tasks:
+                manager.add_task(f"worker {worker} task {number}")
+                operation = "add"
+            elif operation == "complete":
+                manager.mark_task_completed(rng.randrange(len(manager.tasks)))
+            else:
+                manager.remove_task(rng.randrange(len(manager.tasks)))
+            counts[operation] += 1
+            if (number + 1) % save_every == 0:
+                save()
+        if manager.is_modified:
+            save()
+        manager.database.close()
+    counts["latencies"] = latencies
+    return counts
+
+
+# Define function to get a percentile of sorted values
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+# Define function to run the benchmark
+def run_benchmark(workers=4, operations=1000, initial_tasks=1000, mix=DEFAULT_MIX, save_every=1, seed=0):
+    """
+    Starts workers processes that use the same shared task database at the same time.
+    Checks that no update was lost: the final number of tasks must equal the initial tasks,
+    plus every add, minus every remove that was applied.
+    Returns a dict of results.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "tasks.txt")
+        with open(filepath, "w") as file:
+            file.writelines(f"initial task {number} | Pending\n" for number in range(initial_tasks))
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            ToDoListManager(filepath, shared=True).database.close()  # import the text file once
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_worker, filepath, worker, operations, mix, save_every, seed)
+                       for worker in range(workers)]
+            results = [future.result() for future in futures]
+        seconds = time.perf_counter() - started
+
+        database = TaskDatabase(filepath + ".db")
+        final_tasks = len(database.read())
+        database.close()
+
+    latencies = sorted(latency for result in results for latency in result["latencies"])
+    total = {key: sum(result[key] for result in results)
+             for key in ("add", "complete", "remove", "skipped", "removed")}
+    expected_tasks = initial_tasks + total["add"] - total["removed"]
+    return {
+        "workers": workers,
+        "operations": workers * operations,
+        "seconds": seconds,
+        "operations_per_sec": workers * operations / seconds if seconds else 0.0,
+        "saves": len(latencies),
+        "save_p50_ms": percentile(latencies, 0.50) * 1000,
+        "save_p99_ms": percentile(latencies, 0.99) * 1000,
+        **total,
+        "expected_tasks": expected_tasks,
+        "final_tasks": final_tasks,
+        "lost_updates": expected_tasks - final_tasks,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of concurrent workers sharing one task database.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="numbers of worker processes to try")
+    parser.add_argument("--operations", type=int, default=1000, help="operations per worker")
+    parser.add_argument("--initial-tasks", type=int, default=1000, help="tasks in the list before starting")
+    parser.add_argument("--save-every", type=int, default=1, help="operations between two saves")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'Workers':>7} {'Ops':>8} {'Seconds':>8} {'Ops/s':>9} {'Save p50':>9} {'Save p99':>9} "
+          f"{'Skipped':>8} {'Lost':>5}")
+    for workers in args.workers:
+        result = run_benchmark(workers, args.operations, args.initial_tasks, save_every=args.save_every,
+                               seed=args.seed)
+        print(f"{result['workers']:>7} {result['operations']:>8} {result['seconds']:>8.2f} "
+              f"{result['operations_per_sec']:>9.0f} {result['save_p50_ms']:>7.1f}ms "
+              f"{result['save_p99_ms']:>7.1f}ms {result['skipped']:>8} {result['lost_updates']:>5}")
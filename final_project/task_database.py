@@ -0,0 +1,116 @@
+import sqlite3
+from contextlib import contextmanager
+
+
+class TaskDatabase:
+    """
+    Shared task storage in an SQLite database next to the task file (e.g. tasks.txt.db), in WAL mode.
+    Several ToDoListManager processes can use the same database at once:
+    - readers never block the writer, and the writer never blocks readers
+    - each save applies its operations in one write transaction, so no change is lost
+    - task IDs are given by the database and never reused, so an operation on a task that
+      another process removed is skipped instead of hitting a different task
+    Operations are the same (operation, argument) tuples as in TaskJournal.
+    """
+    BUSY_TIMEOUT = 30.0  # seconds to wait for another process's write transaction
+
+    def __init__(self, path, timeout=BUSY_TIMEOUT):
+        self.path = path
+        # isolation_level=None: transactions are started explicitly with BEGIN IMMEDIATE
+        # check_same_thread=False: a TaskFileWatcher thread may read, under the manager's lock
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                          check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS tasks ("
+                                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                                "description TEXT NOT NULL, "
+                                "status TEXT NOT NULL)")
+        # meta records one-time events, e.g. that the text task file was imported
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.version = None  # data_version when the tasks were last read
+
+    # Define context manager for a write transaction
+    @contextmanager
+    def transaction(self):
+        """
+        BEGIN IMMEDIATE takes the write lock up front, so two processes never both read
+        and then fail to upgrade; a busy database is retried for up to the timeout.
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    # Define function to check whether another process changed the tasks since the last read
+    def changed(self):
+        return self.connection.execute("PRAGMA data_version").fetchone()[0] != self.version
+
+    # Define function to read every task
+    def read(self):
+        """
+        Returns a list of (id, description, status) tuples in ID order, which is display order.
+        """
+        # The version is taken first: a change committed in between is read now and again later,
+        # never missed
+        self.version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        return self.connection.execute("SELECT id, description, status FROM tasks ORDER BY id").fetchall()
+
+    # Define function to seed the database once, e.g. from the text task file
+    def import_tasks(self, tasks):
+        """
+        Inserts (description, status) tuples unless an import was already recorded.
+        The import is recorded in the meta table in the same transaction, so a database whose
+        tasks were all removed later is not filled again from the (now outdated) task file.
+        A database created before the meta table existed counts as imported if it has tasks.
+        Returns:
+        - bool: 'True' if the tasks were imported, 'False' if this or another process already did
+        """
+        with self.transaction() as connection:
+            if connection.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone() is not None:
+                return False
+            seeded = connection.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is not None
+            if not seeded:
+                connection.executemany("INSERT INTO tasks (description, status) VALUES (?, ?)", tasks)
+            connection.execute("INSERT INTO meta (key, value) VALUES ('imported', datetime('now'))")
+            return not seeded
+
+    # Define function to check whether the one-time import was done
+    def is_imported(self):
+        return self.connection.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone() is not None
+
+    # Define function to apply operations in one transaction
+    def apply(self, operations, first_new_id):
+        """
+        Applies (operation, argument) tuples in one write transaction.
+        Tasks added since the last read have local IDs counting up from first_new_id;
+        later operations on them are mapped to the IDs the database gives them.
+        Returns:
+        - list: the operations that were skipped because their task no longer exists
+        """
+        new_ids = {}  # local id -> database id
+        skipped = []
+        with self.transaction() as connection:
+            for operation, argument in operations:
+                if operation == "add":
+                    cursor = connection.execute(
+                        "INSERT INTO tasks (description, status) VALUES (?, 'Pending')", (argument,))
+                    new_ids[first_new_id + len(new_ids)] = cursor.lastrowid
+                    continue
+                task_id = new_ids.get(int(argument), int(argument))
+                if operation == "remove":
+                    cursor = connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                elif operation == "complete":
+                    cursor = connection.execute(
+                        "UPDATE tasks SET status = 'Completed' WHERE id = ?", (task_id,))
+                else:
+                    raise ValueError(f"Unknown operation: {operation}")
+                if cursor.rowcount == 0:
+                    skipped.append((operation, argument))
+        return skipped
+
+    def close(self):
+        self.connection.close()
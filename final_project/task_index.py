@@ -0,0 +1,145 @@
+import re
+from bisect import bisect_left, insort
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+# Define function to split a description into lower-case search tokens
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TaskIndex:
+    """
+    Secondary indexes over the tasks of a TaskStore, keyed by task ID:
+    - a status index: status -> sorted IDs (display order), for instant counts and pages per status
+    - an inverted token index: token -> IDs, for keyword and prefix search over descriptions
+    Lookups touch only the matching IDs, so selective queries do not depend on the total task count.
+    The status index is kept up to date on every change. Tokenizing every description is much more
+    expensive, so the token index is built in one pass on the first search and only then kept up
+    to date; loading a file never pays for it. tasks() returns the live tasks for that first build.
+    """
+    def __init__(self, tasks=tuple):
+        self.tasks = tasks
+        self.by_status = {}  # status -> sorted list of task ids
+        self._by_token = None  # token -> set of task ids, None until the first search
+        self._sorted_tokens = None  # vocabulary in sorted order for prefix search, None when it must be rebuilt
+
+    # Define property to get the token index, building it on first use
+    @property
+    def by_token(self):
+        if self._by_token is None:
+            self._by_token = {}
+            for task in self.tasks():
+                self._add_tokens(task)
+        return self._by_token
+
+    # Define function to index a new task
+    def add(self, task):
+        insort(self.by_status.setdefault(task.status, []), task.id)  # new tasks have the largest ID, so this appends
+        if self._by_token is not None:
+            self._add_tokens(task)
+
+    # Define function to add a task to the token index
+    def _add_tokens(self, task):
+        for token in set(tokenize(task.description)):
+            ids = self._by_token.get(token)
+            if ids is None:
+                ids = self._by_token[token] = set()
+                self._sorted_tokens = None
+            ids.add(task.id)
+
+    # Define function to remove an ID from the status index
+    def _remove_status(self, status, task_id):
+        ids = self.by_status.get(status, [])
+        position = bisect_left(ids, task_id)
+        if position < len(ids) and ids[position] == task_id:
+            del ids[position]
+
+    # Define function to remove a task from the indexes
+    def remove(self, task):
+        self._remove_status(task.status, task.id)
+        if self._by_token is not None:
+            self._remove_tokens(task)
+
+    # Define function to remove many tasks from the indexes, filtering each status list once
+    def remove_many(self, tasks):
+        removed = {}  # status -> removed task ids
+        for task in tasks:
+            removed.setdefault(task.status, set()).add(task.id)
+        for status, task_ids in removed.items():
+            self.by_status[status] = [task_id for task_id in self.by_status.get(status, []) if task_id not in task_ids]
+        if self._by_token is not None:
+            for task in tasks:
+                self._remove_tokens(task)
+
+    # Define function to remove a task from the token index
+    def _remove_tokens(self, task):
+        for token in set(tokenize(task.description)):
+            ids = self._by_token.get(token)
+            if ids is not None:
+                ids.discard(task.id)
+                if not ids:
+                    del self._by_token[token]
+                    self._sorted_tokens = None
+
+    # Define function to move a task to another status
+    def change_status(self, task, old_status):
+        self._remove_status(old_status, task.id)
+        insort(self.by_status.setdefault(task.status, []), task.id)
+
+    # Define function to rebuild the indexes from tasks in display order, e.g. after task IDs changed
+    def rebuild(self, tasks):
+        self.by_status = {}
+        self._by_token = None  # rebuilt on the next search
+        self._sorted_tokens = None
+        for task in tasks:
+            self.by_status.setdefault(task.status, []).append(task.id)
+
+    # Define function to count tasks with a status
+    def count(self, status):
+        return len(self.by_status.get(status, ()))
+
+    # Define function to get the IDs of tasks with a status in display order, or the slice start:stop of them
+    def ids_with_status(self, status, start=0, stop=None):
+        return self.by_status.get(status, [])[start:stop]
+
+    # Define function to get the IDs of tasks having a token, or a token starting with prefix
+    def ids_with_token(self, token, prefix=False):
+        if not prefix:
+            return self.by_token.get(token, set())
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self.by_token)
+        ids = set()
+        position = bisect_left(self._sorted_tokens, token)
+        while position < len(self._sorted_tokens) and self._sorted_tokens[position].startswith(token):
+            ids |= self.by_token[self._sorted_tokens[position]]
+            position += 1
+        return ids
+
+    # Define function to find tasks matching every word of a query
+    def search(self, query):
+        """
+        Returns the IDs of tasks whose description contains every word of query.
+        A word ending with '*' matches any token starting with it (prefix search).
+        The smallest candidate set is intersected first.
+        """
+        candidates = []
+        for word in query.lower().split():
+            prefix = word.endswith("*")
+            tokens = tokenize(word)
+            if not tokens:
+                continue
+            # Words like "e-mail" become several tokens; only the last one may be a prefix
+            for token in tokens[:-1]:
+                candidates.append(self.ids_with_token(token))
+            candidates.append(self.ids_with_token(tokens[-1], prefix))
+        if not candidates:
+            return set()
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
@@ -0,0 +1,191 @@
+import hashlib
+import locale
+import os
+from task_watch import FileState
+
+
+# Define function to identify a version of the task file by its content
+def base_stamp(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# Define function to write task IDs as ranges, e.g. [1, 2, 3, 5, 7, 8] -> '1-3,5,7-8'
+def format_ids(task_ids):
+    ranges = []
+    for task_id in task_ids:
+        if ranges and ranges[-1][1] == task_id - 1:
+            ranges[-1][1] = task_id
+        else:
+            ranges.append([task_id, task_id])
+    return ",".join(str(low) if low == high else f"{low}-{high}" for low, high in ranges)
+
+
+# Define function to read task IDs written by format_ids
+def parse_ids(text):
+    task_ids = []
+    for part in filter(None, text.split(",")):
+        low, _, high = part.partition("-")
+        task_ids.extend(range(int(low), int(high or low) + 1))
+    return task_ids
+
+
+class TaskJournal:
+    """
+    Append-only log of task operations stored next to the task file (e.g. tasks.txt.journal).
+    Each line is one operation: 'add<TAB>description', 'remove<TAB>task id' or 'complete<TAB>task id'.
+    The first line, '#base <stamp>', identifies the content of the task file the operations apply to.
+    After a compaction it also holds the IDs of the tasks in the file and the next free ID,
+    '#base <stamp> ids=1-3,5 next=7', so loading gives the tasks the IDs they had before the
+    compaction instead of 1..n; without them, the tasks of the file have the IDs 1..n.
+    The stamp is a hash of that content, so copying the folder, restoring a backup or touching the
+    file keeps the journal valid. A compaction rewrites the task file and starts a new journal, so if
+    a crash happens between the two steps the old journal no longer matches the new task file and is
+    not replayed twice. A journal that does not match is moved aside (see set_aside), never overwritten.
+    """
+    def __init__(self, filepath):
+        self.base_path = filepath
+        self.path = filepath + ".journal"
+        self.count = 0  # number of operations currently in the journal
+        self.base_stamp = base_stamp(b"")  # stamp of the task file content as last loaded or compacted
+        self.stale_path = None  # where the last journal that did not match was moved
+        self.base_ids = None  # (task ids, next id) of the task file, None for 1..n
+        self.state = FileState()  # the journal as last read or written by this process
+
+    # Define function to read the operations recorded for the task file content base_data
+    def read(self, base_data):
+        """
+        Parameters:
+        - base_data (bytes): the content of the task file, as just loaded.
+        Returns (operations, stale) where operations is a list of (operation, argument) tuples.
+        stale is True when the journal belongs to another version of the task file: it is not
+        replayed but moved to self.stale_path, so its operations can still be recovered.
+        A last line without a newline is an interrupted write and is ignored.
+        """
+        self.count = 0
+        self.stale_path = None
+        self.base_ids = None
+        self.base_stamp = base_stamp(base_data)
+        try:
+            data, self.state = FileState.read(self.path)
+        except FileNotFoundError:
+            self.state = FileState()
+            return [], False
+        lines = self._complete_lines(data)
+        if not lines:
+            return [], False
+        header = lines[0].rstrip("\n").split(" ")
+        if header[:2] != ["#base", self.base_stamp]:
+            self.stale_path = self.set_aside()
+            return [], True
+        fields = dict(field.partition("=")[::2] for field in header[2:])
+        if "ids" in fields:
+            self.base_ids = (parse_ids(fields["ids"]), int(fields["next"]))
+        operations = self._parse(lines[1:])
+        self.count = len(operations)
+        return operations, False
+
+    # Define function to read only the operations appended since the last read or write
+    def read_new(self):
+        """
+        Returns the list of new operations, or None when the journal was rewritten
+        (e.g. compacted by another process) and must be read again from the start.
+        """
+        change = self.state.compare(self.path)
+        if change == "unchanged":
+            return []
+        if change != "appended" or self.state.size == 0:
+            return None
+        operations = self._parse(self._complete_lines(self.state.read_appended(self.path)))
+        self.count += len(operations)
+        return operations
+
+    # Define function to split journal bytes into complete lines
+    def _complete_lines(self, data):
+        """
+        A last line without a newline is an interrupted write: it is dropped and the
+        journal state is moved back so the line is read again once it is complete.
+        """
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) < len(data):
+            self.state.size -= len(data) - len(complete)
+            self.state.mtime_ns = None
+            self.state.tail = complete[-FileState.TAIL_SIZE:]
+        text = complete.decode(locale.getpreferredencoding(False))
+        return [line + "\n" for line in text.split("\n")[:-1]]
+
+    # Define function to turn journal lines into (operation, argument) tuples
+    def _parse(self, lines):
+        operations = []
+        for line in lines:
+            operation, _, argument = line.rstrip("\n").partition("\t")
+            operations.append((operation, argument))
+        return operations
+
+    # Define function to append operations and flush them to disk
+    def append(self, operations):
+        """
+        Writes the operations as new journal lines and fsyncs the journal,
+        so a save costs O(number of changes) instead of rewriting every task.
+        Returns the number of bytes written.
+        """
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "w" if new_file else "a") as file:
+            start = os.fstat(file.fileno()).st_size
+            if new_file:
+                file.write(self._header())
+                self.count = 0
+            for operation, argument in operations:
+                file.write(f"{operation}\t{argument}\n")
+            file.flush()
+            os.fsync(file.fileno())
+            written = os.fstat(file.fileno()).st_size - start
+        self.count += len(operations)
+        self.state = FileState.of_file(self.path)
+        return written
+
+    # Define function to build the first line of the journal
+    def _header(self):
+        if self.base_ids is None:
+            return f"#base {self.base_stamp}\n"
+        task_ids, next_id = self.base_ids
+        return f"#base {self.base_stamp} ids={format_ids(task_ids)} next={next_id}\n"
+
+    # Define function to move a journal that does not match the task file out of the way
+    def set_aside(self):
+        """
+        Renames the journal to '<journal>.stale' ('<journal>.stale-2', ... if taken) and returns
+        the new path. Its operations are kept for manual recovery instead of being overwritten.
+        """
+        target = f"{self.path}.stale"
+        number = 1
+        while os.path.exists(target):
+            number += 1
+            target = f"{self.path}.stale-{number}"
+        os.replace(self.path, target)
+        self.state = FileState()
+        return target
+
+    # Define function to write a file atomically through a temporary file
+    def _replace(self, path, lines):
+        temporary = f"{path}.tmp-{os.getpid()}"
+        with open(temporary, "w") as file:
+            file.writelines(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+
+    # Define function to fold the journal into the task file
+    def compact(self, lines, task_ids, next_id):
+        """
+        Rewrites the task file with lines (in the ' | ' text format), then starts an empty journal
+        stamped with the new task file and recording task_ids (the ID of each line) and next_id,
+        so the tasks keep their IDs. Returns the number of bytes written.
+        """
+        self._replace(self.base_path, lines)
+        with open(self.base_path, "rb") as file:
+            self.base_stamp = base_stamp(file.read())
+        self.base_ids = (list(task_ids), next_id)
+        self._replace(self.path, [self._header()])
+        self.count = 0
+        self.state = FileState.of_file(self.path)
+        return os.path.getsize(self.base_path) + self.state.size
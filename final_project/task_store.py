@@ -0,0 +1,182 @@
+from bisect import bisect_left
+from operator import attrgetter
+from task_index import TaskIndex
+
+
+class Task:
+    """
+    A single task with a stable ID. Uses __slots__ to keep each task small.
+    Dict-style access (task["description"]) still works for code written against the old task dicts.
+    """
+    __slots__ = ("id", "description", "status")
+
+    def __init__(self, task_id, description, status="Pending"):
+        self.id = task_id
+        self.description = description
+        self.status = status
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __eq__(self, other):
+        return isinstance(other, Task) and (self.id, self.description, self.status) == \
+            (other.id, other.description, other.status)
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.description!r}, {self.status!r})"
+
+
+class TaskStore:
+    """
+    Ordered task storage with O(1) lookup and removal by ID.
+    - Tasks are kept in a list in display order, with a dict mapping each ID to its slot.
+    - Removing a task leaves a tombstone (None) in its slot instead of shifting later tasks.
+    - Once tombstones outnumber live tasks, the list is compacted in one O(n) pass,
+      which keeps removal amortized O(1).
+    - Display numbers (1, 2, 3, ...) map to tasks through a list of live tasks; a removal deletes
+      the task from that list (found by binary search on its ID), bulk removals rebuild it once.
+    - IDs grow in display order, so sorting IDs gives display order.
+    - The longest description length is kept as a running value (see max_description_length).
+    - self.index (a TaskIndex) is updated by every method that changes tasks; change a status
+      through set_status rather than assigning task.status, so the status index stays in sync.
+    """
+    COMPACT_MIN_TOMBSTONES = 64
+
+    def __init__(self):
+        self._slots = []  # Task or None, in display order
+        self._slot_of = {}  # task id -> index in self._slots
+        self._tombstones = 0
+        self._view = None  # live tasks in display order, None when it must be rebuilt
+        self.next_id = 1
+        self.index = TaskIndex(self.__iter__)
+        self._length_counts = {}  # description length -> number of live tasks with it
+        self._max_length = 0
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __iter__(self):
+        return (task for task in self._slots if task is not None)
+
+    # Tasks by display position, as with the old list of task dicts
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    # Longest live description, for the width of the description column
+    @property
+    def max_description_length(self):
+        return self._max_length
+
+    # Define function to keep the description length counts up to date
+    def _count_length(self, description, change):
+        length = len(description)
+        count = self._length_counts.get(length, 0) + change
+        if count:
+            self._length_counts[length] = count
+        else:
+            del self._length_counts[length]
+        if change > 0 and length > self._max_length:
+            self._max_length = length
+        elif change < 0 and length == self._max_length and not count:
+            self._max_length = max(self._length_counts, default=0)
+
+    # Define function to get the display number (1, 2, 3, ...) of a task
+    def position_of(self, task):
+        return bisect_left(self.view(), task.id, key=attrgetter("id")) + 1
+
+    # Define function to get the live tasks in display order
+    def view(self):
+        if self._view is None:
+            self._view = [task for task in self._slots if task is not None]
+        return self._view
+
+    # Define function to add a task at the end of the list
+    # task_id, when given (e.g. by a TaskDatabase), must be larger than every ID in the store
+    def add(self, description, status="Pending", task_id=None):
+        task = Task(self.next_id if task_id is None else task_id, description, status)
+        self.next_id = task.id + 1
+        self._slot_of[task.id] = len(self._slots)
+        self._slots.append(task)
+        if self._view is not None:
+            self._view.append(task)
+        self.index.add(task)
+        self._count_length(description, 1)
+        return task
+
+    # Define function to look up a task by ID, returns None if there is no such task
+    def get(self, task_id):
+        slot = self._slot_of.get(task_id)
+        return None if slot is None else self._slots[slot]
+
+    # Define function to remove a task by ID, returns the removed task or None
+    def remove(self, task_id):
+        task = self._remove(task_id)
+        if task is not None and self._view is not None:
+            del self._view[bisect_left(self._view, task.id, key=attrgetter("id"))]
+        return task
+
+    # Define function to remove many tasks by ID, returns the removed tasks
+    def remove_many(self, task_ids):
+        removed = [task for task in (self._remove(task_id, reindex=False) for task_id in task_ids) if task is not None]
+        if removed:
+            self._view = None  # one rebuild instead of one list deletion per task
+            self.index.remove_many(removed)  # and one pass over each status list
+        return removed
+
+    # Remove a task from the slots (and from the indexes if reindex), leaving the live view to the caller
+    def _remove(self, task_id, reindex=True):
+        slot = self._slot_of.pop(task_id, None)
+        if slot is None:
+            return None
+        task = self._slots[slot]
+        self._slots[slot] = None
+        if reindex:
+            self.index.remove(task)
+        self._count_length(task.description, -1)
+        self._tombstones += 1
+        if self._tombstones >= self.COMPACT_MIN_TOMBSTONES and self._tombstones > len(self._slot_of):
+            self.compact()
+        return task
+
+    # Define function to change the status of a task by ID, returns the task or None
+    def set_status(self, task_id, status):
+        task = self.get(task_id)
+        if task is not None and task.status != status:
+            old_status = task.status
+            task.status = status
+            self.index.change_status(task, old_status)
+        return task
+
+    # Define function to get tasks from a collection of IDs, in display order
+    def tasks_for_ids(self, task_ids):
+        return [self._slots[self._slot_of[task_id]] for task_id in sorted(task_ids)]
+
+    # Define function to drop tombstones and renumber the slots
+    def compact(self):
+        self._slots = [task for task in self._slots if task is not None]
+        self._slot_of = {task.id: slot for slot, task in enumerate(self._slots)}
+        self._tombstones = 0
+
+    # Define function to mark every pending task matching predicate as completed
+    def complete_where(self, predicate):
+        completed = [task for task in self if task.status != "Completed" and predicate(task)]
+        for task in completed:
+            self.set_status(task.id, "Completed")
+        return completed
+
+    # Define function to give the live tasks new IDs, in display order: task_ids (increasing,
+    # one per task) and next_id, e.g. the IDs recorded at a journal compaction, or 1..n by default
+    def renumber(self, task_ids=None, next_id=None):
+        self.compact()
+        if task_ids is None:
+            task_ids = range(1, len(self._slots) + 1)
+        if len(task_ids) != len(self._slots) or any(low >= high for low, high in zip(task_ids, task_ids[1:])):
+            raise ValueError("renumber needs one increasing ID per task")
+        for task_id, task in zip(task_ids, self._slots):
+            task.id = task_id
+        self._slot_of = {task.id: slot for slot, task in enumerate(self._slots)}
+        self.next_id = max(next_id or 0, task_ids[-1] + 1 if task_ids else 1)
+        self.index.rebuild(self._slots)
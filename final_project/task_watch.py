@@ -0,0 +1,114 @@
+import functools
+import os
+import threading
+
+
+class FileState:
+    """
+    What a file looked like when it was last read or written: inode, size, modification time
+    and its last few bytes. Comparing with the file on disk tells whether it is unchanged,
+    only had lines appended, or was rewritten.
+    """
+    TAIL_SIZE = 64
+
+    def __init__(self, inode=None, size=0, mtime_ns=None, tail=b""):
+        self.inode = inode
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.tail = tail
+
+    # Define function to capture the state of a file
+    @classmethod
+    def of_file(cls, path):
+        try:
+            with open(path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                file.seek(max(stat.st_size - cls.TAIL_SIZE, 0))
+                tail = file.read()
+        except FileNotFoundError:
+            return cls()
+        return cls(stat.st_ino, stat.st_size, stat.st_mtime_ns, tail)
+
+    # Define function to read a whole file together with the state matching exactly what was read
+    @classmethod
+    def read(cls, path):
+        """
+        Returns (data, state). The size is taken from the bytes read, so lines appended while
+        reading are picked up by the next incremental read instead of being lost.
+        """
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            data = file.read()
+        return data, cls(stat.st_ino, len(data), stat.st_mtime_ns, data[-cls.TAIL_SIZE:])
+
+    # Define function to compare with the file on disk
+    def compare(self, path):
+        """
+        Returns:
+        - 'unchanged': same inode, size and modification time
+        - 'appended': same inode and the old content ends with the same bytes and a full line,
+          followed by new data
+        - 'rewritten': anything else, including a file that appeared or disappeared
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return "unchanged" if self.inode is None else "rewritten"
+        if stat.st_ino != self.inode:
+            return "rewritten"
+        if stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns:
+            return "unchanged"
+        if stat.st_size > self.size and (self.size == 0 or self.tail.endswith(b"\n")):
+            with open(path, "rb") as file:
+                file.seek(self.size - len(self.tail))
+                if file.read(len(self.tail)) == self.tail:
+                    return "appended"
+        return "rewritten"
+
+    # Define function to read the data appended since this state, and move the state forward
+    def read_appended(self, path):
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            file.seek(self.size)
+            data = file.read()
+        self.size += len(data)
+        self.mtime_ns = stat.st_mtime_ns
+        self.tail = (self.tail + data)[-self.TAIL_SIZE:]
+        return data
+
+
+# Define decorator to run a ToDoListManager method while holding the manager's lock
+def synchronized(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class TaskFileWatcher:
+    """
+    Background thread that polls the task file (and journal) every interval seconds
+    and refreshes the manager when another process changed them.
+    Polling works everywhere without extra packages; the check itself is a stat call.
+    """
+    def __init__(self, manager, interval=2.0):
+        self.manager = manager
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="TaskFileWatcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.manager.refresh()
+            except Exception as e:
+                print(f"Error watching tasks: {e}")
@@ -1,6 +1,11 @@
 # dice module
 import random 
 
+try:
+    import numpy as np
+except ImportError: # numpy is only needed for ArrayDice
+    np = None
+
 class Die: 
     def __init__(self):
         self.value = 1 # default value is 1
@@ -17,4 +22,78 @@ class Dice:
     
     def rollAll(self): 
         for die in self.list: # then assign the randomly generated values as a list
-            die.roll() # call roll method of die to randomly get number 1 to 6
\ No newline at end of file
+            die.roll() # call roll method of die to randomly get number 1 to 6
+
+class ArrayDie(Die):
+    """
+    A Die whose value is one slot of an ArrayDice buffer, so the Die interface
+    keeps working on array-backed dice.
+    """
+    def __init__(self, dice, position):
+        self.dice = dice
+        self.position = position
+
+    @property
+    def value(self):
+        return int(self.dice.values[self.position])
+
+    @value.setter
+    def value(self, value):
+        self.dice.values[self.position] = value
+
+    def roll(self):
+        self.value = self.dice.generator.integers(1, 7) # roll only this die
+
+class ArrayDice(Dice):
+    """
+    Dice whose values are stored in a single NumPy buffer and rolled in one batched call.
+    - count: number of dice to start with, all showing 1
+    - seed: an int (or SeedSequence/Generator) for reproducible rolls, None for fresh entropy
+    dice.list still gives Die objects, as views over the buffer.
+    addDie copies the value of the Die it is given into the buffer, so that Die is not rolled
+    with the others; use the ArrayDie view it returns to follow the new die.
+    """
+    DTYPE = "int8" # values 1 to 6 fit in one byte, so a million dice take 1 MB
+
+    def __init__(self, count=0, seed=None):
+        if np is None:
+            raise ImportError("ArrayDice requires numpy. Please install it with 'pip install numpy'.")
+        self.generator = np.random.default_rng(seed)
+        self._buffer = np.ones(count, dtype=self.DTYPE) # default value is 1, spare capacity past _count
+        self._count = count
+        self._views = None # ArrayDie views, built when dice.list is first used
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def values(self): # the dice in use, a view of the buffer so writes reach it
+        return self._buffer[:self._count]
+
+    @property
+    def list(self):
+        if self._views is None or len(self._views) != len(self.values):
+            self._views = [ArrayDie(self, position) for position in range(len(self.values))]
+        return self._views
+
+    def addDie(self, die): # returns the ArrayDie view of the new die
+        if self._count == len(self._buffer): # full, so double the capacity: amortized O(1) per die
+            buffer = np.ones(max(2 * self._count, 8), dtype=self.DTYPE)
+            buffer[:self._count] = self.values
+            self._buffer = buffer
+        self._buffer[self._count] = die.value
+        self._count += 1
+        return ArrayDie(self, self._count - 1)
+
+    def rollAll(self):
+        self.values[:] = self.generator.integers(1, 7, size=len(self.values), dtype=self.DTYPE)
+
+    def rollTrials(self, trials):
+        """
+        Rolls all the dice trials times at once.
+        Returns a (trials, number of dice) array; the dice show the values of the last trial.
+        """
+        rolls = self.generator.integers(1, 7, size=(trials, len(self.values)), dtype=self.DTYPE)
+        if trials:
+            self.values[:] = rolls[-1]
+        return rolls
@@ -1,3 +1,5 @@
+import argparse
+import time
 # import Dice and Die classes from dice module
 from dice import Dice, Die
 
@@ -27,5 +29,29 @@ def main():
             print("Bye!")
             break
 
+def run_simulation(count, rolls, seed=None, workers=1):
+    # roll without printing each die and show the statistics instead
+    from dice_simulation import simulate # needs numpy, so only imported for simulations
+    started = time.perf_counter()
+    stats = simulate(count, rolls, seed=seed, workers=workers)
+    seconds = time.perf_counter() - started
+
+    print(f"Rolled {count} dice {stats.rolls:,} times ({stats.die_rolls:,} die rolls) in {seconds:.2f}s")
+    print("Face counts: " + "  ".join(f"{face}: {int(number):,}" for face, number in enumerate(stats.face_counts, start=1)))
+    print(f"Total: mean {stats.mean:.4f}, variance {stats.variance:.4f}")
+    print(f"Fairness: chi-square {stats.chi_square():.3f}, p-value {stats.p_value():.4f}")
+    return stats
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Dice Roller")
+    parser.add_argument("--simulate", type=int, metavar="ROLLS", help="roll ROLLS times and show statistics only")
+    parser.add_argument("--dice", type=int, default=1, help="number of dice for --simulate")
+    parser.add_argument("--seed", type=int, help="seed for reproducible simulations")
+    parser.add_argument("--workers", type=int, default=1, help="processes for --simulate")
+    args = parser.parse_args()
+    if args.dice < 1:
+        parser.error("--dice must be at least 1")
+    if args.simulate is not None:
+        run_simulation(args.dice, args.simulate, args.seed, args.workers)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,139 @@
+# dice simulation module: roll dice many times and keep only running statistics
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dice import ArrayDice
+
+SIDES = 6
+CHUNK_DIE_ROLLS = 1 << 20 # die rolls per batch, so memory stays constant (about 10 MB) however long the run
+SHARD_DIE_ROLLS = 1 << 24 # die rolls per shard; each shard has its own random stream
+
+class RollStats:
+    """
+    Constant-memory statistics of repeated rolls of dice_count dice:
+    - face_counts[f - 1]: how many times face f came up, over all dice
+    - sum_counts[s]: how many rolls had a total of s
+    - running mean and variance of the roll totals (Chan et al. parallel update)
+    - chi-square test that the faces are fair
+    Two RollStats of the same dice count can be merged, e.g. from parallel workers.
+    """
+    def __init__(self, dice_count):
+        self.dice_count = dice_count
+        self.rolls = 0
+        self.face_counts = np.zeros(SIDES, dtype=np.int64)
+        self.sum_counts = np.zeros(SIDES * dice_count + 1, dtype=np.int64)
+        self.mean = 0.0 # mean of the roll totals
+        self.m2 = 0.0 # sum of squared differences from the mean
+
+    # Define function to add a batch of rolls, one row per roll
+    def update(self, rolls):
+        if len(rolls) == 0:
+            return
+        self.face_counts += np.bincount(rolls.ravel(), minlength=SIDES + 1)[1:]
+        totals = rolls.sum(axis=1, dtype=np.int64)
+        self.sum_counts += np.bincount(totals, minlength=len(self.sum_counts))
+        mean = totals.mean()
+        self._combine(len(totals), mean, float(((totals - mean) ** 2).sum()))
+
+    # Define function to combine the running mean and variance with another batch
+    def _combine(self, count, mean, m2):
+        total = self.rolls + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.rolls * count / total
+        self.rolls = total
+
+    # Define function to merge statistics computed separately
+    def merge(self, other):
+        if other.dice_count != self.dice_count:
+            raise ValueError("Cannot merge statistics of different numbers of dice.")
+        if other.rolls:
+            self.face_counts += other.face_counts
+            self.sum_counts += other.sum_counts
+            self._combine(other.rolls, other.mean, other.m2)
+        return self
+
+    @property
+    def die_rolls(self):
+        return self.rolls * self.dice_count
+
+    @property
+    def variance(self):
+        return self.m2 / (self.rolls - 1) if self.rolls > 1 else 0.0
+
+    # Define function to get the chi-square statistic of the face counts against fair dice
+    def chi_square(self):
+        expected = self.die_rolls / SIDES
+        if not expected:
+            return 0.0
+        return float(((self.face_counts - expected) ** 2).sum() / expected)
+
+    # Define function to get the probability of a chi-square at least this large with fair dice
+    def p_value(self):
+        """
+        Survival function of the chi-square distribution with SIDES - 1 = 5 degrees of freedom,
+        in closed form for odd degrees of freedom, so no extra package is needed.
+        """
+        x = self.chi_square()
+        root = math.sqrt(x)
+        return math.erfc(root / math.sqrt(2)) + \
+            math.sqrt(2 / math.pi) * math.exp(-x / 2) * (root + root ** 3 / 3)
+
+    # Define function to get the statistics as plain Python values
+    def summary(self):
+        return {
+            "dice": self.dice_count,
+            "rolls": self.rolls,
+            "die_rolls": self.die_rolls,
+            "face_counts": {face: int(count) for face, count in enumerate(self.face_counts, start=1)},
+            "sum_counts": {total: int(count) for total, count in enumerate(self.sum_counts) if count},
+            "mean": self.mean,
+            "variance": self.variance,
+            "chi_square": self.chi_square(),
+            "p_value": self.p_value(),
+        }
+
+# Define function to roll one shard of a simulation with its own random stream
+def simulate_shard(dice_count, rolls, seed_sequence):
+    dice = ArrayDice(dice_count, seed=seed_sequence)
+    stats = RollStats(dice_count)
+    chunk = max(1, CHUNK_DIE_ROLLS // dice_count)
+    for start in range(0, rolls, chunk):
+        stats.update(dice.rollTrials(min(chunk, rolls - start)))
+    return stats
+
+# Define function to split a simulation into shards
+def plan_shards(dice_count, rolls, seed=None):
+    """
+    Returns a list of (dice_count, rolls, seed_sequence) arguments for simulate_shard.
+    Shards depend only on the roll count, never on the number of workers, and each gets
+    an independent stream spawned from the seed, so a seed always gives the same result.
+    """
+    shard_rolls = max(1, SHARD_DIE_ROLLS // dice_count)
+    shards = math.ceil(rolls / shard_rolls)
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    return [(dice_count, min(shard_rolls, rolls - number * shard_rolls), seeds[number])
+            for number in range(shards)]
+
+# Define function to run a simulation
+def simulate(dice_count, rolls, seed=None, workers=1):
+    """
+    Rolls dice_count dice rolls times and returns the merged RollStats.
+    - seed: an int for reproducible results, None for fresh entropy
+    - workers: number of processes; shards are merged in order, so the result does not
+      depend on the number of workers
+    """
+    if dice_count < 1:
+        raise ValueError(f"dice_count must be at least 1, got {dice_count}")
+    shards = plan_shards(dice_count, rolls, seed)
+    stats = RollStats(dice_count)
+    if workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard_stats in executor.map(simulate_shard, *zip(*shards)):
+                stats.merge(shard_stats)
+    else:
+        for shard in shards:
+            stats.merge(simulate_shard(*shard))
+    return stats
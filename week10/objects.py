@@ -1,12 +1,188 @@
 # Object module that has Product class
-class Product: 
+import csv
+from array import array
+
+try:
+    import numpy as np
+except ImportError: # numpy is only needed for ProductCatalog
+    np = None
+
+if np is not None:
+    from product_index import NameIndex, PriceIndex
+
+class Product:
+    # __slots__ instead of a __dict__ keeps each product small in large catalogs
+    __slots__ = ("name", "_price", "_discountPercent", "_discountAmount", "_discountedPrice")
+
     def __init__(self, name, price, discountPercent): # 3 parameters
-        self.name = name # attribute 1 
-        self.price = price # attribute 2
-        self.discountPercent = discountPercent # attribute 3
+        self.name = name # attribute 1
+        self._price = price # attribute 2
+        self._discountPercent = discountPercent # attribute 3
+        self._discountAmount = None # cached derived prices, None until first used
+        self._discountedPrice = None
+
+    @property
+    def price(self):
+        return self._price
+
+    @price.setter
+    def price(self, price): # a new price invalidates the cached derived prices
+        self._price = price
+        self._discountAmount = self._discountedPrice = None
+
+    @property
+    def discountPercent(self):
+        return self._discountPercent
+
+    @discountPercent.setter
+    def discountPercent(self, discountPercent): # a new discount invalidates the cached derived prices
+        self._discountPercent = discountPercent
+        self._discountAmount = self._discountedPrice = None
+
+    def getDiscountAmount(self): # method of Product class that returns discount amount
+        if self._discountAmount is None:
+            self._discountAmount = self._price * self._discountPercent / 100
+        return self._discountAmount
 
-    def getDiscountAmount(self): # method of Product class that returns discount amount 
-        return self.price * self.discountPercent / 100
-    
     def getDiscountedPrice(self): # method of Product class that returns discounted price
-        return self.price - self.getDiscountAmount()
\ No newline at end of file
+        if self._discountedPrice is None:
+            self._discountedPrice = self._price - self.getDiscountAmount()
+        return self._discountedPrice
+
+class ProductCatalog:
+    """
+    Columnar storage for many products: names in a list, prices and discount percents in
+    NumPy arrays, instead of one Product object per product.
+    - discount amounts and discounted prices for the whole catalog are computed in one
+      vectorized pass, cached until a price or discount changes
+    - a name index gives the position of a product by name in O(1)
+    - catalog[i] and len(catalog) work like a tuple of Products, so the viewer can use it directly
+    - prefix/substring name search and price ranges use indexes built on first use
+      (see product_index)
+    """
+    def __init__(self):
+        if np is None:
+            raise ImportError("ProductCatalog requires numpy. Please install it with 'pip install numpy'.")
+        self.names = []
+        self._prices = np.empty(0, dtype=np.float64)
+        self._discounts = np.empty(0, dtype=np.int64)
+        self._pending_prices = array("d") # appended values, moved into the NumPy arrays when next read
+        self._pending_discounts = array("q")
+        self.index = {} # name -> position of the first product with that name
+        self._discountAmounts = None # cached vectorized results, None until first used
+        self._discountedPrices = None
+        self._nameIndex = None # search indexes, None until first used
+        self._priceIndex = None
+        self.rejected = 0 # rows skipped by from_csv
+
+    @classmethod
+    def from_products(cls, products):
+        catalog = cls()
+        for product in products:
+            catalog.add(product.name, product.price, product.discountPercent)
+        return catalog
+
+    @classmethod
+    def from_csv(cls, filepath):
+        """
+        Streams products from a CSV file with the columns name, price and discountPercent,
+        one row at a time, so only the columns are ever held in memory.
+        Rows with a missing or invalid price or discount are skipped and counted in catalog.rejected.
+        """
+        catalog = cls()
+        with open(filepath, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return catalog
+            try:
+                columns = [header.index(column) for column in ("name", "price", "discountPercent")]
+            except ValueError:
+                raise ValueError(f"{filepath} must have the columns name, price and discountPercent.") from None
+            name_column, price_column, discount_column = columns
+            for row in reader:
+                try:
+                    catalog.add(row[name_column], float(row[price_column]), int(row[discount_column]))
+                except (IndexError, ValueError, OverflowError):
+                    catalog.rejected += 1
+        return catalog
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, position): # a Product built from the catalog's columns
+        if not -len(self.names) <= position < len(self.names):
+            raise IndexError("product position out of range")
+        return Product(self.names[position], float(self.prices[position]), int(self.discounts[position]))
+
+    def __iter__(self):
+        return (self[position] for position in range(len(self.names)))
+
+    # Define function to move appended values into the NumPy arrays
+    def _flush(self):
+        if self._pending_prices:
+            self._prices = np.concatenate((self._prices, np.frombuffer(self._pending_prices, dtype=np.float64)))
+            self._discounts = np.concatenate((self._discounts, np.frombuffer(self._pending_discounts, dtype=np.int64)))
+            self._pending_prices = array("d")
+            self._pending_discounts = array("q")
+
+    @property
+    def prices(self):
+        self._flush()
+        return self._prices
+
+    @property
+    def discounts(self):
+        self._flush()
+        return self._discounts
+
+    def add(self, name, price, discountPercent): # returns the position of the new product
+        position = len(self.names)
+        self._pending_discounts.append(discountPercent) # first, as it is the one append that can fail
+        self._pending_prices.append(price)
+        self.names.append(name)
+        self.index.setdefault(name, position)
+        self._discountAmounts = self._discountedPrices = None
+        self._nameIndex = self._priceIndex = None
+        return position
+
+    def position(self, name): # position of the product called name, None if there is none
+        return self.index.get(name)
+
+    def find(self, name): # the Product called name, None if there is none
+        position = self.index.get(name)
+        return None if position is None else self[position]
+
+    def setPrice(self, position, price):
+        self.prices[position] = price
+        self._discountAmounts = self._discountedPrices = None
+        self._priceIndex = None
+
+    def setDiscountPercent(self, position, discountPercent):
+        self.discounts[position] = discountPercent
+        self._discountAmounts = self._discountedPrices = None
+
+    def getDiscountAmounts(self): # discount amount of every product, same arithmetic as Product
+        if self._discountAmounts is None:
+            self._discountAmounts = self.prices * self.discounts / 100
+        return self._discountAmounts
+
+    def getDiscountedPrices(self): # discounted price of every product
+        if self._discountedPrices is None:
+            self._discountedPrices = self.prices - self.getDiscountAmounts()
+        return self._discountedPrices
+
+    def searchPrefix(self, text): # positions of products whose name starts with text, ignoring case
+        if self._nameIndex is None:
+            self._nameIndex = NameIndex(self.names)
+        return self._nameIndex.prefix(text)
+
+    def searchSubstring(self, text): # positions of products whose name contains text, ignoring case
+        if self._nameIndex is None:
+            self._nameIndex = NameIndex(self.names)
+        return self._nameIndex.substring(text)
+
+    def priceBetween(self, low=None, high=None): # positions of products priced low to high, cheapest first
+        if self._priceIndex is None:
+            self._priceIndex = PriceIndex(self.prices)
+        return self._priceIndex.between(low, high)
@@ -0,0 +1,58 @@
+# Search indexes for ProductCatalog: product names and prices
+from bisect import bisect_left
+
+import numpy as np
+
+class NameIndex:
+    """
+    Case-insensitive search over product names, built once for the whole catalog:
+    - prefix search on the names sorted in lower case, with binary search: O(log n + matches)
+    - substring search on all lower-case names joined into one text, searched with str.find
+      (a C loop over the text), then mapped back to products with the start offset of each name
+    Results are arrays of catalog positions in catalog order.
+    """
+    def __init__(self, names):
+        lowered = [name.lower() for name in names]
+        self.order = np.array(sorted(range(len(lowered)), key=lowered.__getitem__), dtype=np.int64)
+        self.sorted_names = [lowered[position] for position in self.order]
+        self.text = "\n".join(name.replace("\n", " ") for name in lowered)
+        lengths = np.fromiter((len(name) + 1 for name in lowered), dtype=np.int64, count=len(lowered))
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])) # start of each name in self.text
+
+    def prefix(self, text):
+        text = text.lower()
+        start = bisect_left(self.sorted_names, text)
+        end = start # the names starting with text follow each other from start, whatever characters come next
+        while end < len(self.sorted_names) and self.sorted_names[end].startswith(text):
+            end += 1
+        return np.sort(self.order[start:end])
+
+    def substring(self, text):
+        text = text.lower()
+        if not text or "\n" in text:
+            return np.empty(0, dtype=np.int64)
+        positions = []
+        found = self.text.find(text)
+        while found != -1:
+            position = int(np.searchsorted(self.offsets, found, side="right")) - 1
+            positions.append(position)
+            # continue after this name, so a name matching twice is listed once
+            next_name = self.text.find("\n", found)
+            if next_name == -1:
+                break
+            found = self.text.find(text, next_name + 1)
+        return np.array(positions, dtype=np.int64)
+
+class PriceIndex:
+    """
+    Product positions sorted by price, for price ranges in O(log n + matches).
+    Results are arrays of catalog positions from the lowest to the highest price.
+    """
+    def __init__(self, prices):
+        self.order = np.argsort(prices, kind="stable")
+        self.sorted_prices = prices[self.order]
+
+    def between(self, low=None, high=None): # low <= price <= high, None for no bound
+        start = 0 if low is None else np.searchsorted(self.sorted_prices, low, side="left")
+        end = len(self.order) if high is None else np.searchsorted(self.sorted_prices, high, side="right")
+        return self.order[start:end]
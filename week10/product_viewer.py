@@ -1,11 +1,55 @@
-from objects import Product
+import argparse
+import sys
+from objects import Product, ProductCatalog, np
 
-def display_products(products):
-    print("PRODUCTS")
-    for i in range(len(products)):
-        product = products[i]
-        print(str(i+1) + ". " + product.name)
-    print()
+PAGE_SIZE = 20 # number of products shown per page
+COMMANDS = "Commands: next, prev, page N, search TEXT, prefix TEXT, price LOW HIGH, all"
+
+def display_products(products, positions=None, page=1, page_size=PAGE_SIZE):
+    # show one page of products: the whole catalog, or the positions found by a search
+    # the numbers are always product numbers in the whole catalog, so they can be used to view a product
+    # the page is assembled first and written to the screen in a single write
+    if positions is None:
+        positions = range(len(products))
+    pages = max(1, -(-len(positions) // page_size))
+    page = min(max(page, 1), pages)
+    names = getattr(products, "names", None) # a ProductCatalog gives names without building Products
+    lines = ["PRODUCTS"]
+    for position in positions[(page - 1) * page_size:page * page_size]:
+        position = int(position)
+        name = names[position] if names is not None else products[position].name
+        lines.append(str(position+1) + ". " + name)
+    if not len(positions):
+        lines.append("No products found.")
+    if pages > 1:
+        lines.append("Page {:d} of {:d} ({:d} products)".format(page, pages, len(positions)))
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
+    return page
+
+def run_command(products, positions, page, command, argument):
+    # apply a paging or search command, returns the new (positions, page)
+    # positions None means the whole catalog
+    try:
+        if command == "next":
+            return positions, page + 1
+        if command == "prev":
+            return positions, page - 1
+        if command == "page":
+            return positions, int(argument)
+        if command == "search":
+            return products.searchSubstring(argument), 1
+        if command == "prefix":
+            return products.searchPrefix(argument), 1
+        if command == "price":
+            low, high = (float(bound) for bound in argument.split())
+            return products.priceBetween(low, high), 1
+        if command == "all":
+            return None, 1
+    except ValueError:
+        print("Invalid command. " + COMMANDS)
+        print()
+    return positions, page
 
 def display_product(product):
     print("PRODUCT DATA")
@@ -16,23 +60,59 @@ def display_product(product):
     print("Discounted price:\t${:.2f}".format(product.getDiscountedPrice()))
     print()
 
-def main():
+def main(filepath=None):
     print("Welcome to the Product Viewer Program!")
     print()
 
-    # assign a tuple of Product objects
-    products = (
-            Product("Stanley 13 Ounce Wood Hammer", 12.99,   62),
-            Product('National Hardware 3/4" Wire Nails', 5.06, 30),
-            Product("Economy Duct Tape, 60 yds, Silver", 7.24, 15))
-    display_products(products) # call display_products method and pass the products tuple
+    if filepath is not None:
+        # stream the catalog from a CSV file with the columns name, price and discountPercent
+        products = ProductCatalog.from_csv(filepath)
+        if products.rejected:
+            print("Skipped {:d} invalid rows in {:s}".format(products.rejected, filepath))
+            print()
+    else:
+        # assign a tuple of products, kept in a catalog that also indexes them by name when numpy is installed
+        products = (Product("Stanley 13 Ounce Wood Hammer", 12.99,   62),
+                    Product('National Hardware 3/4" Wire Nails', 5.06, 30),
+                    Product("Economy Duct Tape, 60 yds, Silver", 7.24, 15))
+        if np is not None:
+            products = ProductCatalog.from_products(products)
+    # name -> product for a plain tuple, a ProductCatalog has its own name index
+    names = None if isinstance(products, ProductCatalog) else {}
+    if names is not None:
+        for product in products:
+            names.setdefault(product.name, product) # the first product with a name, like the catalog index
+    if len(products) > PAGE_SIZE:
+        print(COMMANDS)
+        print()
+    positions, page = None, 1 # the products listed: None for all, or the result of the last search
+    page = display_products(products) # call display_products method and pass the products catalog
 
     while True: 
-        number = int(input("Enter product number to view: "))
+        selection = input("Enter product number or name to view: ")
         print()
 
-        selected_product = products[number-1]
-        display_product(selected_product)
+        command, _, argument = selection.strip().partition(" ")
+        if command in ("search", "prefix", "price") and names is not None:
+            print("Searching needs numpy. Please install it with 'pip install numpy'.")
+            print()
+            continue
+        if command in ("next", "prev", "page", "search", "prefix", "price", "all"):
+            positions, page = run_command(products, positions, page, command, argument.strip())
+            page = display_products(products, positions, page)
+            continue
+
+        if selection.isdigit():
+            number = int(selection)
+            selected_product = products[number-1] if 1 <= number <= len(products) else None
+        else:
+            # O(1) lookup in the name index
+            selected_product = products.find(selection) if names is None else names.get(selection)
+        if selected_product is None:
+            print("No product found for '" + selection + "'.")
+            print()
+        else:
+            display_product(selected_product)
 
         choice = input("View another product? (y/n): ")
         print()
@@ -41,4 +121,7 @@ def main():
             break
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Product Viewer")
+    parser.add_argument("catalog", nargs="?", help="CSV file with the columns name, price and discountPercent")
+    args = parser.parse_args()
+    main(args.catalog)
\ No newline at end of file
@@ -1,99 +1,417 @@
+import argparse
 import csv
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+import os
 import re
+import sys
+import time
+from columnar import CustomerColumns, CustomerRowsView, np
+from streaming import DEFAULT_CHUNK_SIZE, AverageAggregator, FilterAggregator, stream_rows
+from parallel import throughput, validate_parallel
+from parsers import parse_amount, parse_iso_date
+from indexes import SortedIndex
+from snapshot import read_snapshot, source_key, write_snapshot
+from query import AGGREGATES, AmountAbove, AmountAggregates, And, PurchasedBetween, project
+from writer import FIELDS, write_customers_csv
+from rollups import DEFAULT_PERCENTS, RECENCY_EDGES, Rollups, rollup_parallel
+# The metrics module is shared with the other manager; appended so it never shadows a local module
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from instrumentation import METRICS, instrumented  # noqa: E402
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Define function to validate and convert one row in place, raising ValueError on bad data
+def validate_customer(row):
+    # Validate and convert PurchaseAmount
+    row['PurchaseAmount'] = parse_amount(row['PurchaseAmount'])
+    if row['PurchaseAmount'] < 0:
+        raise ValueError("Puchase Amount should be positive.")
+
+    # Validate and convert PurchaseDate
+    try: 
+        row['PurchaseDate'] = parse_iso_date(row['PurchaseDate'])
+    except ValueError: 
+        raise ValueError(f"Invalid date format: {row['PurchaseDate']}")
+
+    # Validate Email
+    if not EMAIL_PATTERN.match(row['Email']):
+        raise ValueError(f"Invalid email format: {row['Email']}")
+
+# Define function to format and report a rejected row
+def error_message(row, error):
+    return f"Error processing row: {row}. Error: {error}"
+
+def report_error(row, error):
+    METRICS.reject(error)
+    print(error_message(row, error))
+
+# Define functions giving rows and bytes to @instrumented
+def loaded_rows(self, result):
+    return len(self.customers) + len(self.rejected)
+
+def input_size(self, filepath, *args, **kwargs):
+    return os.path.getsize(filepath)
+
+def output_size(self, output_file, *args, **kwargs):
+    return os.path.getsize(output_file)
+
+# Define function to convert a customer into an output CSV row
+def output_row(cust):
+    return {
+        'CustomerID': cust['CustomerID'],
+        'Name': cust['Name'],
+        'Email': cust['Email'],
+        'PurchaseAmount': cust['PurchaseAmount'],
+        'PurchaseDate': cust['PurchaseDate'].date()
+    }
 
 # Initialize the class
 class CustomerManager:
-    def __init__(self, filepath):
-        self.customers = []
-        self.load_data(filepath)
+    def __init__(self, filepath, backend='rows', workers=None, snapshot=False):
+        # backend='rows' keeps one dict per customer, backend='columnar' keeps numpy columns
+        # workers=N validates the file across N processes instead of in this process
+        # snapshot=True (columnar only) reuses a validated snapshot stored next to the CSV
+        self.load_stats = None
+        self.rejected = []  # error messages of the rows skipped while loading
+        self.rollups = Rollups()  # group-by totals, caught up with self.customers on each report
+        if snapshot and backend != 'columnar':
+            raise ValueError("Snapshots are only supported with backend='columnar'.")
+        if backend == 'columnar':
+            self.columns = CustomerColumns()
+            self.customers = CustomerRowsView(self.columns)  # list-of-dicts compatibility view
+            self.date_index = None  # the columns keep their own cached indexes
+            self.amount_index = None
+        elif backend == 'rows':
+            self.columns = None
+            self.customers = []
+            self.date_index = SortedIndex()  # PurchaseDate -> position, kept sorted for cutoff queries
+            self.amount_index = SortedIndex()  # PurchaseAmount -> position, for thresholds and percentiles
+        else:
+            raise ValueError(f"Unknown backend: {backend}. Use 'rows' or 'columnar'.")
+        if snapshot and self.load_snapshot(filepath):
+            return
+        source = self.snapshot_source(filepath) if snapshot else None  # the CSV as it is before parsing
+        if workers:
+            self.load_data_parallel(filepath, workers)
+        else:
+            self.load_data(filepath)
+        if source is not None:
+            self.save_snapshot(filepath, source)
+
+    # Define function to load validated columns from the snapshot of filepath, if it is still current
+    def load_snapshot(self, filepath):
+        loaded = read_snapshot(filepath)
+        if loaded is None:
+            return False
+        self.columns, rejected = loaded
+        self.customers = CustomerRowsView(self.columns)
+        # Report the skipped rows exactly as the full parse did
+        for message in rejected:
+            print(message)
+        self.rejected = rejected
+        return True
+
+    # Define function to describe the CSV before it is parsed, None if it cannot be read
+    def snapshot_source(self, filepath):
+        try:
+            return source_key(filepath)
+        except OSError:
+            return None  # load_data reports the error
+
+    # Define function to store the validated columns next to filepath for later runs
+    # (source: the snapshot_source taken before the rows were parsed)
+    def save_snapshot(self, filepath, source):
+        try:
+            write_snapshot(filepath, self.columns, self.rejected, source)
+        except Exception as e:
+            print(f"Warning! Could not save snapshot: {e}")
+
+    # Define function to report a rejected row and remember its message
+    def reject(self, row, error):
+        METRICS.reject(error)
+        message = error_message(row, error)
+        print(message)
+        self.rejected.append(message)
+
+    # Define function to keep one validated row in the active backend
+    def add_customer(self, row):
+        if self.columns is not None:
+            self.columns.append(row)
+        else:
+            self.date_index.add(row['PurchaseDate'], len(self.customers))
+            self.amount_index.add(row['PurchaseAmount'], len(self.customers))
+            self.customers.append(row)
+
+    # Define function to get the sorted index of a column for the active backend
+    def index(self, name):
+        if self.columns is not None:
+            return self.columns.index(name)
+        return {'PurchaseDate': self.date_index, 'PurchaseAmount': self.amount_index}[name]
 
     # Define function to load the dataset from the file
+    @instrumented('customers.load_data', rows=loaded_rows, bytes_read=input_size)
     def load_data(self, filepath):
         try:
             with open(filepath, mode='r', newline='', encoding='utf-8') as file:
                 reader = csv.DictReader(file)
                 for row in reader:
                     try: 
-                        # Validate and convert PurchaseAmount
-                        row['PurchaseAmount'] = float(row['PurchaseAmount'])
-                        if row['PurchaseAmount'] < 0:
-                            raise ValueError("Puchase Amount should be positive.")
-
-                        # Validate and convert PurchaseDate
-                        try: 
-                            row['PurchaseDate'] = datetime.strptime(row['PurchaseDate'], '%Y-%m-%d')
-                        except ValueError: 
-                            raise ValueError(f"Invalid date format: {row['PurchaseDate']}")
+                        validate_customer(row)
+                        self.add_customer(row)
 
-                        # Validate Email
-                        if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', row['Email']):
-                            raise ValueError(f"Invalid email format: {row['Email']}")
+                    except Exception as e:
+                        self.reject(row, e)
 
-                        self.customers.append(row)
+        except Exception as e:
+            print(f"Error loading file: {e}")
 
+    # Define function to load the dataset with a pool of worker processes
+    @instrumented('customers.load_data_parallel', rows=loaded_rows, bytes_read=input_size)
+    def load_data_parallel(self, filepath, workers=None):
+        """
+        Validates the file in parallel shards and merges the rows back in file order.
+        Rejected rows are reported with the same messages as load_data.
+        Stores and returns a throughput summary: rows, seconds, rows_per_sec and workers.
+        """
+        started = time.perf_counter()
+        rows = 0
+        try:
+            for row, error in validate_parallel(filepath, validate_customer, workers):
+                rows += 1
+                if error is None:
+                    try:
+                        self.add_customer(row)
                     except Exception as e:
-                        print(f"Error processing row: {row}. Error: {e}")
+                        self.reject(row, e)
+                else:
+                    self.reject(row, error)
+        except Exception as e:
+            print(f"Error loading file: {e}")
+        self.load_stats = throughput(rows, started, workers)
+        return self.load_stats
 
+    # Define function to run every report in one streaming pass, without loading the file into memory
+    # (a staticmethod: the first argument the metric functions get is filepath, not self)
+    @staticmethod
+    @instrumented('customers.stream_report',
+                  rows=lambda filepath, result: result['rows_loaded'] + result['rows_rejected'],
+                  bytes_read=lambda filepath, *args, **kwargs: os.path.getsize(filepath),
+                  bytes_written=lambda filepath, output_file, *args, **kwargs: os.path.getsize(output_file))
+    def stream_report(filepath, output_file, threshold=500, months=6, chunk_size=DEFAULT_CHUNK_SIZE,
+                      on_high_spender=None, on_inactive=None):
+        """
+        Reads filepath in chunks of chunk_size rows and feeds each chunk to four aggregators:
+        high spenders, running average, inactive customers and the combined filter of save_filtered_data.
+        The combined filter is written to output_file as rows arrive.
+        High spenders and inactive customers are collected unless on_high_spender / on_inactive
+        callbacks are given, in which case matches are handed over in file order and memory stays constant.
+        Returns a dict with the same results as the in-memory methods.
+        """
+        cutoff_date = datetime.now() - relativedelta(months=months)
+        high_spenders = FilterAggregator(lambda cust: cust['PurchaseAmount'] > threshold, on_high_spender)
+        inactive_customers = FilterAggregator(lambda cust: cust['PurchaseDate'] < cutoff_date, on_inactive)
+        average = AverageAggregator('PurchaseAmount')
+        rows_loaded = rows_rejected = 0
+        try:
+            with open(output_file, mode='w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=FIELDS)
+                writer.writeheader()
+                filtered = FilterAggregator(
+                    lambda cust: cust['PurchaseAmount'] > threshold and cust['PurchaseDate'] < cutoff_date,
+                    lambda cust: writer.writerow(output_row(cust)))
+                rows_loaded, rows_rejected = stream_rows(
+                    filepath, validate_customer, [high_spenders, average, inactive_customers, filtered],
+                    chunk_size, on_error=report_error)
         except Exception as e:
             print(f"Error loading file: {e}")
 
+        inactive_customers.matches.sort(key=lambda x: x['PurchaseDate'])
+        return {
+            'high_spenders': high_spenders.matches if on_high_spender is None else None,
+            'average': average.average,
+            'inactive_customers': inactive_customers.matches if on_inactive is None else None,
+            'rows_loaded': rows_loaded,
+            'rows_rejected': rows_rejected,
+        }
+
     # Define function to display customers who purchase above the threshold
+    @instrumented('customers.display_high_spenders')
     def display_high_spenders(self, threshold=500):
-        high_spenders = [cust for cust in self.customers if cust['PurchaseAmount'] > threshold]
-        for customer in high_spenders:
+        # The index finds the matches, sorting only the matches restores file order
+        for position in sorted(self.index('PurchaseAmount').above(threshold)):
+            customer = self.customers[position]
             print(f"{customer['Name']} (${customer['PurchaseAmount']:.2f})")
 
+    # Define function to count customers who purchase above the threshold
+    def count_high_spenders(self, threshold=500):
+        return self.index('PurchaseAmount').count_above(threshold)
+
+    # Define function to get the k customers with the largest purchases, largest first
+    def top_spenders(self, k=10):
+        return [self.customers[position] for position in self.index('PurchaseAmount').top(k)]
+
+    # Define function to get purchase amount percentiles, e.g. {50: median, 90: p90, 99: p99}
+    def purchase_percentiles(self, percents=(50, 90, 99)):
+        index = self.index('PurchaseAmount')
+        return {percent: index.percentile(percent) for percent in percents}
+
+    # Define function to count customers per purchase amount bucket, edges like numpy.histogram
+    def purchase_histogram(self, edges):
+        return self.index('PurchaseAmount').histogram(edges)
+
     # Define function to calculate and display average purchase amount
+    @instrumented('customers.calculate_average_purchase', rows=lambda self, result: len(self.customers))
     def calculate_average_purchase(self):
+        if self.columns is not None:
+            average = float(self.columns.amounts.mean()) if len(self.columns) else 0
+            print(f"${average:.2f}")
+            return average
         total = sum(cust['PurchaseAmount'] for cust in self.customers)
         average = total / len(self.customers) if self.customers else 0
         print(f"${average:.2f}")
         return average
 
-    # Define function to filter inactive customers
-    def find_inactive_customers(self, months=6):
-        cutoff_date = datetime.now() - relativedelta(months=months)
-        inactive_customers = [
-            cust for cust in self.customers 
-            if cust['PurchaseDate'] < cutoff_date
-        ]
-        inactive_customers.sort(key=lambda x: x['PurchaseDate'])
+    # Define function to get the rollups, adding the customers loaded or appended since the last report
+    def _current_rollups(self):
+        start = self.rollups.size
+        if start < len(self.customers):
+            if self.columns is not None:
+                self.rollups.add_columns(self.columns, start)
+            else:
+                self.rollups.update(self.customers[start:])
+        return self.rollups
+
+    # Define function to get count / sum / avg / min / max and percentiles of PurchaseAmount per group
+    @instrumented('customers.rollup', rows=lambda self, result: len(result))
+    def rollup(self, grouping='month', percents=DEFAULT_PERCENTS):
+        """
+        grouping: 'month' ('YYYY-MM'), 'domain' (email domain, lower case) or 'day' (PurchaseDate).
+        Returns {group: {'count', 'sum', 'avg', 'min', 'max', 'p50', ...}} sorted by group.
+        Percentiles are approximate (within 1%), the other figures are exact.
+        Only rows added since the previous report are read, so repeated reports cost O(groups).
+        """
+        return self._current_rollups().report(grouping, percents)
+
+    # Define function to get the same figures per recency bucket, e.g. '6-12 months' since the purchase
+    @instrumented('customers.recency_rollup', rows=lambda self, result: len(result))
+    def recency_rollup(self, edges=RECENCY_EDGES, percents=DEFAULT_PERCENTS):
+        return self._current_rollups().recency(edges, percents)
 
+    # Define function to roll up a file across a pool of worker processes, without loading its rows
+    # (a staticmethod like stream_report; the shards' rollups are merged in file order)
+    @staticmethod
+    def rollup_file(filepath, workers=None):
+        try:
+            return rollup_parallel(filepath, validate_customer, workers, on_error=report_error)
+        except Exception as e:
+            print(f"Error loading file: {e}")
+            return None
+
+    # Define function to get positions of customers whose last purchase is in [older_cutoff, newer_cutoff),
+    # sorted by PurchaseDate
+    def _positions_between(self, older_cutoff, newer_cutoff):
+        if older_cutoff is None:
+            return self.index('PurchaseDate').below(newer_cutoff)
+        return self.index('PurchaseDate').between(older_cutoff, newer_cutoff)
+
+    # Define function to print and return the customers at the given positions
+    def _display_inactive(self, positions):
+        inactive_customers = [self.customers[position] for position in positions]
         for cust in inactive_customers:
             print(f"{cust['Name']} (Last Purchase: {cust['PurchaseDate'].date()})")
         return inactive_customers
 
+    # Define function to filter inactive customers
+    @instrumented('customers.find_inactive_customers', rows=lambda self, result: len(result))
+    def find_inactive_customers(self, months=6):
+        cutoff_date = datetime.now() - relativedelta(months=months)
+        return self._display_inactive(self._positions_between(None, cutoff_date))
+
+    # Define function to filter customers inactive for at least min_months but less than max_months
+    @instrumented('customers.find_inactive_between', rows=lambda self, result: len(result))
+    def find_inactive_between(self, min_months=6, max_months=12):
+        now = datetime.now()
+        newer_cutoff = now - relativedelta(months=min_months)
+        older_cutoff = now - relativedelta(months=max_months)
+        return self._display_inactive(self._positions_between(older_cutoff, newer_cutoff))
+
+    # Define function to get the positions matching a predicate, in file order
+    def _query_positions(self, where):
+        if self.columns is not None:
+            if where is None:
+                return range(len(self.columns))
+            return np.flatnonzero(where.mask(self.columns))
+        candidates = None if where is None else where.lookup(self.index)
+        if candidates is None:
+            # No usable index: one fused pass evaluating the whole predicate per row
+            return (position for position, cust in enumerate(self.customers) if where is None or where.match(cust))
+        # Index narrowed the candidates: restore file order and check the remaining conditions
+        return (position for position in sorted(candidates) if where.match(self.customers[position]))
+
+    # Define function to yield matching customers one at a time, in file order
+    def iter_query(self, where=None, fields=None):
+        for position in self._query_positions(where):
+            yield project(self.customers[position], fields)
+
+    # Define function to filter, project and aggregate customers in one pass
+    @instrumented('customers.query', rows=lambda self, result: len(result['rows']))
+    def query(self, where=None, fields=None, aggregates=()):
+        """
+        Runs a query built from the predicates in query.py, for example
+        And(AmountAbove(500), PurchasedBetween(end=cutoff)) or AmountAbove(1000) | EmailDomain('example.com').
+        - fields: columns to keep in each row, None keeps the whole row
+        - aggregates: any of 'count', 'sum', 'avg', 'min', 'max' over PurchaseAmount of the matches
+        Returns {'rows': [...], 'aggregates': {...}}. Rows are in file order and each customer appears once.
+        """
+        for name in aggregates:
+            if name not in AGGREGATES:
+                raise ValueError(f"Unknown aggregate: {name}. Use one of {', '.join(AGGREGATES)}.")
+        if self.columns is not None:
+            positions = np.asarray(self._query_positions(where), dtype=np.intp)
+            amounts = self.columns.amounts[positions]
+            totals = {
+                'count': len(amounts),
+                'sum': float(amounts.sum()),
+                'avg': float(amounts.mean()) if len(amounts) else 0,
+                'min': float(amounts.min()) if len(amounts) else None,
+                'max': float(amounts.max()) if len(amounts) else None,
+            }
+            rows = [project(self.customers[position], fields) for position in positions]
+            return {'rows': rows, 'aggregates': {name: totals[name] for name in aggregates}}
+        totals = AmountAggregates()
+        rows = []
+        for position in self._query_positions(where):
+            cust = self.customers[position]
+            totals.add(cust['PurchaseAmount'])
+            rows.append(project(cust, fields))
+        return {'rows': rows, 'aggregates': totals.result(aggregates)}
+
     # Define function to save filtered data
-    def save_filtered_data(self, output_file, threshold=500, months=6):
+    @instrumented('customers.save_filtered_data', bytes_written=output_size)
+    def save_filtered_data(self, output_file, threshold=500, months=6, compression=None):
 
         # Set cutoff_date as 6 months from current datetime
         cutoff_date = datetime.now() - relativedelta(months=months)
 
         # Filter customers who purchased more than $500 and and inactive for 6+ months
-        filtered_customers = [
-            cust for cust in self.customers
-            if cust['PurchaseAmount'] > threshold and cust['PurchaseDate'] < cutoff_date
-        ]
-
-        # Save to output CSV
-        with open(output_file, mode='w', newline='', encoding='utf-8') as file:
-            fields = ['CustomerID', 'Name', 'Email', 'PurchaseAmount', 'PurchaseDate']
-            writer = csv.DictWriter(file, fieldnames=fields)
-            writer.writeheader()
-            for cust in filtered_customers:
-                writer.writerow({
-                    'CustomerID': cust['CustomerID'],
-                    'Name': cust['Name'],
-                    'Email': cust['Email'],
-                    'PurchaseAmount': cust['PurchaseAmount'],
-                    'PurchaseDate': cust['PurchaseDate'].date()
-                })
+        filtered_customers = self.iter_query(And(AmountAbove(threshold), PurchasedBetween(end=cutoff_date)))
+
+        # Save to output CSV, streaming the matches straight from the query (compression: None, 'gzip' or 'zstd')
+        write_customers_csv(output_file, filtered_customers, compression)
         print(f"Suceessful! Results are saved to {output_file}")
 
 # Execute functions in Main Program
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Customer reports")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="record timings and row counts and write them to FILE (Prometheus text for .prom, else JSON)")
+    parser.add_argument("--profile", action="store_true", help="also run cProfile and print its report")
+    parser.add_argument("--trace-memory", action="store_true", help="also record peak memory with tracemalloc")
+    args = parser.parse_args()
+    if args.metrics or args.profile or args.trace_memory:
+        METRICS.enable(profile=args.profile, trace_memory=args.trace_memory)
+
     cm = CustomerManager('week11/assignment2/Costum_data.csv')
 
     print("Customers who made purchases above $500:")
@@ -107,3 +425,8 @@ if __name__ == "__main__":
 
     # Save filtered data to a new CSV
     cm.save_filtered_data('week11/assignment2/output/filtered_customer_data.csv', 500, 6)
+
+    if args.metrics:
+        METRICS.export(args.metrics)
+    if args.profile:
+        sys.stderr.write(METRICS.profile_report())
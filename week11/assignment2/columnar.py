@@ -0,0 +1,161 @@
+# Columnar storage for validated customer rows
+from array import array
+from collections.abc import Sequence
+from datetime import datetime
+from indexes import ArrayIndex
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the columnar backend
+    np = None
+
+# Day numbers are stored relative to 1970-01-01 so they map straight onto datetime64[D]
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+
+class DictionaryColumn:
+    """
+    A string column stored as integer codes into a table of distinct values.
+    Repeated names and emails are kept only once, each row costs one int32 code.
+    """
+    def __init__(self, values=None, codes=None):
+        self.values = [] if values is None else values  # distinct strings, in first-seen order
+        self.lookup = None if values else {}  # string -> code, rebuilt on the first append after a snapshot load
+        self.codes = array('i') if codes is None else codes
+
+    def append(self, value):
+        if self.lookup is None:
+            self.lookup = {text: code for code, text in enumerate(self.values)}
+        if not isinstance(self.codes, array):
+            self.codes = array('i', self.codes)  # snapshot codes are a read-only memory map
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.lookup[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, position):
+        return self.values[self.codes[position]]
+
+
+class CustomerColumns:
+    """
+    Stores customers as typed columns instead of one dict per row:
+    - CustomerID as int64, PurchaseAmount as float64, PurchaseDate as datetime64[D]
+    - Name and Email as dictionary-encoded string columns
+    CustomerID must be an integer; rows with any other ID are rejected. An ID whose text is not
+    how the integer prints (e.g. '007') keeps its text in id_texts, so rows read back as loaded.
+    Rows are appended into compact array builders and moved into numpy arrays
+    the first time a numeric column is read after an append.
+    """
+    def __init__(self):
+        if np is None:
+            raise ImportError("The columnar backend requires numpy. Please install it with 'pip install numpy'.")
+        self.names = DictionaryColumn()
+        self.emails = DictionaryColumn()
+        self._ids = np.empty(0, dtype=np.int64)
+        self._amounts = np.empty(0, dtype=np.float64)
+        self._dates = np.empty(0, dtype='datetime64[D]')
+        self.id_texts = {}  # position -> CustomerID text, only where it differs from str(int(text))
+        self._pending_ids = array('q')
+        self._pending_amounts = array('d')
+        self._pending_dates = array('q')
+        self._indexes = {}  # column name -> ArrayIndex, rebuilt after appends
+
+    def __len__(self):
+        return len(self.names.codes)
+
+    # Define function to build columns from existing arrays, e.g. a memory-mapped snapshot
+    @classmethod
+    def from_arrays(cls, ids, amounts, dates, names, name_codes, emails, email_codes, id_texts=None):
+        columns = cls()
+        columns._ids = ids
+        columns.id_texts = id_texts or {}
+        columns._amounts = amounts
+        columns._dates = dates
+        columns.names = DictionaryColumn(names, name_codes)
+        columns.emails = DictionaryColumn(emails, email_codes)
+        return columns
+
+    # Define function to append one validated row
+    def append(self, row):
+        try:
+            customer_id = int(row['CustomerID'])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid CustomerID: {row['CustomerID']}")
+        if row['CustomerID'] != str(customer_id):
+            self.id_texts[len(self)] = row['CustomerID']
+        self._pending_ids.append(customer_id)
+        self._pending_amounts.append(row['PurchaseAmount'])
+        self._pending_dates.append(row['PurchaseDate'].toordinal() - EPOCH_ORDINAL)
+        self.names.append(row['Name'])
+        self.emails.append(row['Email'])
+
+    # Move rows appended since the last read into the numpy columns
+    def _flush(self):
+        if self._pending_ids:
+            self._ids = np.concatenate([self._ids, np.array(self._pending_ids, dtype=np.int64)])
+            self._amounts = np.concatenate([self._amounts, np.array(self._pending_amounts, dtype=np.float64)])
+            dates = np.array(self._pending_dates, dtype=np.int64).view('datetime64[D]')
+            self._dates = np.concatenate([self._dates, dates])
+            self._pending_ids = array('q')
+            self._pending_amounts = array('d')
+            self._pending_dates = array('q')
+
+    @property
+    def ids(self):
+        self._flush()
+        return self._ids
+
+    @property
+    def amounts(self):
+        self._flush()
+        return self._amounts
+
+    @property
+    def dates(self):
+        self._flush()
+        return self._dates
+
+    # Define function to get the sorted index of a numeric column, cached until rows are appended
+    def index(self, name):
+        column = {'CustomerID': self.ids, 'PurchaseAmount': self.amounts, 'PurchaseDate': self.dates}[name]
+        index = self._indexes.get(name)
+        if index is None or index.size != len(column):
+            index = self._indexes[name] = ArrayIndex(column)
+        return index
+
+    # Define function to build the row dict used by the list-of-dicts API
+    def row(self, position):
+        return {
+            'CustomerID': self.id_texts.get(position) or str(int(self.ids[position])),
+            'Name': self.names[position],
+            'Email': self.emails[position],
+            'PurchaseAmount': float(self.amounts[position]),
+            'PurchaseDate': datetime.fromordinal(int(self.dates[position].astype(np.int64)) + EPOCH_ORDINAL),
+        }
+
+
+class CustomerRowsView(Sequence):
+    """
+    Read-only list-of-dicts view over CustomerColumns.
+    Rows are built on access, so code written against `self.customers` keeps working.
+    """
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.columns.row(i) for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("customer index out of range")
+        return self.columns.row(position)
+
+    def __repr__(self):
+        return f"CustomerRowsView({len(self)} customers)"
@@ -1,22 +1,43 @@
 import csv
+import shutil
+import tempfile
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+from indexes import SortedIndex
+from parsers import parse_amount, parse_iso_date
+from streaming import DEFAULT_CHUNK_SIZE, AverageAggregator, FilterAggregator, stream_rows
+
+FIELDS = ['CustomerID', 'Name', 'Email', 'PurchaseAmount', 'PurchaseDate']
+
+def convert_amount(row):
+    row['PurchaseAmount'] = parse_amount(row['PurchaseAmount'])
 
 class CustomerManager:
     def __init__(self, filepath):
         self.customers = []
+        self.amount_index = SortedIndex()
         self.load_data(filepath)
     
     def load_data(self, filepath):
         with open(filepath, mode='r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
             for row in reader:
-                row['PurchaseAmount'] = float(row['PurchaseAmount'])
+                convert_amount(row)
+                self.amount_index.add(row['PurchaseAmount'], len(self.customers))
                 self.customers.append(row)
     
     def filter_high_spenders(self, threshold):
-        high_spenders = [cust for cust in self.customers if cust['PurchaseAmount'] > threshold]
+        high_spenders = [self.customers[position] for position in sorted(self.amount_index.above(threshold))]
         return high_spenders
+
+    def count_high_spenders(self, threshold):
+        return self.amount_index.count_above(threshold)
+
+    def top_spenders(self, k=10):
+        return [self.customers[position] for position in self.amount_index.top(k)]
+
+    def purchase_percentiles(self, percents=(50, 90, 99)):
+        return {percent: self.amount_index.percentile(percent) for percent in percents}
     
     def calculate_average_purchase(self):
         total_amount = sum(cust['PurchaseAmount'] for cust in self.customers)
@@ -26,17 +47,46 @@ class CustomerManager:
         cutoff_date = datetime.now() - relativedelta(months=months)
         inactive_customers = [
             cust for cust in self.customers
-            if datetime.strptime(cust['PurchaseDate'], '%Y-%m-%d') < cutoff_date
+            if parse_iso_date(cust['PurchaseDate']) < cutoff_date
         ]
         return inactive_customers
     
     def save_filtered_data(self, high_spenders, inactive_customers, filename='filtered_customer_data_2.csv'):
-        fields = ['CustomerID', 'Name', 'Email', 'PurchaseAmount', 'PurchaseDate']
         with open(filename, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=fields)
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
             writer.writeheader()
             writer.writerows(high_spenders)
-            writer.writerows(inactive_customers)
+            # Customers in both lists are written once
+            written = {id(cust) for cust in high_spenders}
+            writer.writerows(cust for cust in inactive_customers if id(cust) not in written)
+
+    @staticmethod
+    def stream_report(filepath, threshold=500, months=6, filename='filtered_customer_data_2.csv',
+                      chunk_size=DEFAULT_CHUNK_SIZE):
+        # Same output as filter_high_spenders + find_inactive_customers + save_filtered_data,
+        # but the file is read in chunks and matches are written out as they are found.
+        # Inactive rows go to a temporary file and are appended after the high spenders,
+        # so memory stays constant. Returns (average_purchase, high_spender_count, inactive_count).
+        cutoff_date = datetime.now() - relativedelta(months=months)
+        with open(filename, mode='w', newline='', encoding='utf-8') as file, \
+                tempfile.TemporaryFile(mode='w+', newline='', encoding='utf-8') as spool:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            spool_writer = csv.DictWriter(spool, fieldnames=FIELDS)
+            high_spenders = FilterAggregator(lambda cust: cust['PurchaseAmount'] > threshold, writer.writerow)
+
+            def spool_inactive(cust):
+                # High spenders are already written, so only the other inactive customers are spooled
+                if not cust['PurchaseAmount'] > threshold:
+                    spool_writer.writerow(cust)
+
+            inactive_customers = FilterAggregator(
+                lambda cust: parse_iso_date(cust['PurchaseDate']) < cutoff_date, spool_inactive)
+            average = AverageAggregator('PurchaseAmount')
+            stream_rows(filepath, convert_amount, [high_spenders, average, inactive_customers], chunk_size)
+            spool.seek(0)
+            shutil.copyfileobj(spool, file)
+        return average.average, high_spenders.count, inactive_customers.count
 
 # Usage example (assuming the file path and other details are correct):
 cm = CustomerManager("week11/assignment2/Costum_data.csv")
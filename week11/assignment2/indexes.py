@@ -0,0 +1,128 @@
+# Sorted secondary indexes over customer positions
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for ArrayIndex
+    np = None
+
+
+class IndexQueries:
+    """
+    Queries shared by every sorted index. Subclasses provide `keys` and `positions`
+    (sorted by key, positions in insertion order for equal keys) and `_bound(value, side)`,
+    the number of keys below value ('left') or not above value ('right').
+    Every query is a binary search plus a slice, O(log n) before the slice is copied.
+    NaN keys are left out of the index: they compare false with every threshold,
+    so the plain list filters never matched them either.
+    """
+    # Define function to get positions whose key is below value, in key order
+    def below(self, value):
+        return self.positions[:self._bound(value, 'left')]
+
+    # Define function to get positions whose key is in [low, high), in key order
+    def between(self, low, high):
+        return self.positions[self._bound(low, 'left'):self._bound(high, 'left')]
+
+    # Define function to get positions whose key is above value, in key order
+    def above(self, value):
+        return self.positions[self._bound(value, 'right'):]
+
+    # Define function to get the slice [start, stop) of keys in [low, high), None meaning unbounded
+    def bounds(self, low=None, high=None):
+        start = 0 if low is None else self._bound(low, 'left')
+        stop = len(self) if high is None else self._bound(high, 'left')
+        return start, max(start, stop)
+
+    # Define function to count keys above value without copying any positions
+    def count_above(self, value):
+        return len(self) - self._bound(value, 'right')
+
+    # Define function to get the positions of the k largest keys, largest first
+    def top(self, k):
+        positions = self.positions
+        return positions[max(len(positions) - k, 0):][::-1]
+
+    # Define function to get a percentile (0-100) of the keys, interpolated like numpy.percentile
+    def percentile(self, percent):
+        keys = self.keys
+        if not len(keys):
+            return None
+        rank = (len(keys) - 1) * percent / 100
+        lower = int(rank)
+        upper = min(lower + 1, len(keys) - 1)
+        return float(keys[lower] + (keys[upper] - keys[lower]) * (rank - lower))
+
+    # Define function to count keys per bucket [edges[i], edges[i+1]), last bucket including its right edge
+    def histogram(self, edges):
+        bounds = [self._bound(edge, 'left') for edge in edges[:-1]]
+        bounds.append(self._bound(edges[-1], 'right'))
+        return [high - low for low, high in zip(bounds, bounds[1:])]
+
+
+class SortedIndex(IndexQueries):
+    """
+    Keeps (key, position) pairs sorted by key in plain lists.
+    New pairs go into a pending list and are merged on the next query, so loading stays O(1) per row
+    and a merge of the two sorted runs costs O(n) once instead of O(n) per insert.
+    """
+    def __init__(self):
+        self._keys = []
+        self._positions = []
+        self._pending = []
+
+    def __len__(self):
+        return len(self._keys) + len(self._pending)
+
+    # Define function to register a row under its key
+    def add(self, key, position):
+        if key == key:  # skip NaN
+            self._pending.append((key, position))
+
+    # Merge pending pairs into the sorted lists
+    def _merge(self):
+        if self._pending:
+            self._pending.sort()
+            merged = list(zip(self._keys, self._positions))
+            merged.extend(self._pending)
+            merged.sort()  # two sorted runs, which Timsort merges in linear time
+            self._keys = [key for key, _ in merged]
+            self._positions = [position for _, position in merged]
+            self._pending = []
+
+    @property
+    def keys(self):
+        self._merge()
+        return self._keys
+
+    @property
+    def positions(self):
+        self._merge()
+        return self._positions
+
+    def _bound(self, value, side):
+        search = bisect_left if side == 'left' else bisect_right
+        return search(self.keys, value)
+
+
+class ArrayIndex(IndexQueries):
+    """
+    Sorted view of one numpy column: a stable argsort and the column values in that order.
+    Built once per column and rebuilt by the owner when rows are appended (see `size`).
+    """
+    def __init__(self, column):
+        positions = np.argsort(column, kind='stable')
+        keys = column[positions]
+        valid = keys == keys  # drop NaN / NaT, which argsort places at the end
+        self.positions = positions[valid]
+        self.keys = keys[valid]
+        self.size = len(column)  # rows covered, including skipped NaN rows
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _bound(self, value, side):
+        if isinstance(value, datetime):
+            value = np.datetime64(value)  # keep the time of day when comparing with datetime64[D]
+        return int(np.searchsorted(self.keys, value, side))
@@ -0,0 +1,41 @@
+# Fast parsers for the PurchaseDate and PurchaseAmount columns
+from datetime import datetime
+from functools import lru_cache
+
+# Exports hold only a few thousand distinct dates, so a bounded memo catches nearly every row
+DATE_CACHE_SIZE = 8192
+
+
+# Define function to parse a 'YYYY-MM-DD' date, memoized on the raw string
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_iso_date(text):
+    # Fast path: exactly 'YYYY-MM-DD' with ASCII digits
+    if len(text) == 10 and text[4] == '-' and text[7] == '-' and text.isascii() \
+            and text[:4].isdigit() and text[5:7].isdigit() and text[8:].isdigit():
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            pass
+    # Anything unusual goes through strptime, which raises the same errors as before
+    return datetime.strptime(text, '%Y-%m-%d')
+
+
+def parse_iso_date(text):
+    """
+    Same result as datetime.strptime(text, '%Y-%m-%d'), including the exceptions it raises.
+    Valid strings are cached, invalid ones are re-checked on every call.
+    """
+    if type(text) is not str:
+        return datetime.strptime(text, '%Y-%m-%d')  # keeps the original TypeError for missing fields
+    return _parse_iso_date(text)
+
+
+# Define function to parse PurchaseAmount
+def parse_amount(value):
+    """
+    Same result as float(value). float() already parses plain decimals in C,
+    so the only shortcut is returning values that are already floats unchanged.
+    """
+    if type(value) is float:
+        return value
+    return float(value)
@@ -0,0 +1,172 @@
+# Composable customer filters, evaluated in one fused pass or through the sorted indexes
+from columnar import np
+
+
+class Predicate:
+    """
+    Base class for query filters. Every predicate can:
+    - match(cust): test one customer dict (rows backend, fused scan)
+    - mask(columns): build a boolean numpy mask (columnar backend)
+    - lookup(index_of) / estimate(index_of): return candidate positions and their count from a
+      sorted index, or None when no index applies. index_of(name) returns the index for a column.
+    """
+    def lookup(self, index_of):
+        return None
+
+    def estimate(self, index_of):
+        return None
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+
+class AmountAbove(Predicate):
+    # PurchaseAmount > threshold
+    def __init__(self, threshold):
+        self.threshold = threshold
+
+    def match(self, cust):
+        return cust['PurchaseAmount'] > self.threshold
+
+    def mask(self, columns):
+        return columns.amounts > self.threshold
+
+    def lookup(self, index_of):
+        return index_of('PurchaseAmount').above(self.threshold)
+
+    def estimate(self, index_of):
+        return index_of('PurchaseAmount').count_above(self.threshold)
+
+
+class PurchasedBetween(Predicate):
+    # start <= PurchaseDate < end, either end may be None
+    def __init__(self, start=None, end=None):
+        self.start = start
+        self.end = end
+
+    def match(self, cust):
+        date = cust['PurchaseDate']
+        return (self.start is None or date >= self.start) and (self.end is None or date < self.end)
+
+    def mask(self, columns):
+        mask = np.ones(len(columns), dtype=bool)
+        if self.start is not None:
+            mask &= columns.dates >= np.datetime64(self.start)
+        if self.end is not None:
+            mask &= columns.dates < np.datetime64(self.end)
+        return mask
+
+    def lookup(self, index_of):
+        index = index_of('PurchaseDate')
+        start, stop = index.bounds(self.start, self.end)
+        return index.positions[start:stop]
+
+    def estimate(self, index_of):
+        start, stop = index_of('PurchaseDate').bounds(self.start, self.end)
+        return stop - start
+
+
+class EmailDomain(Predicate):
+    # Email ends with '@domain', case-insensitive
+    def __init__(self, domain):
+        self.domain = domain.lower().lstrip('@')
+
+    def match(self, cust):
+        return cust['Email'].rpartition('@')[2].lower() == self.domain
+
+    def mask(self, columns):
+        # Test each distinct email once, then map the answers onto the rows through the codes
+        matches = np.array([email.rpartition('@')[2].lower() == self.domain for email in columns.emails.values],
+                           dtype=bool)
+        return matches[np.asarray(columns.emails.codes, dtype=np.intp)]
+
+
+class And(Predicate):
+    def __init__(self, *predicates):
+        self.predicates = predicates
+
+    def match(self, cust):
+        return all(predicate.match(cust) for predicate in self.predicates)
+
+    def mask(self, columns):
+        mask = np.ones(len(columns), dtype=bool)
+        for predicate in self.predicates:
+            mask &= predicate.mask(columns)
+        return mask
+
+    # Use the most selective indexed child, the other children are checked row by row
+    def _best(self, index_of):
+        estimates = [(predicate.estimate(index_of), i) for i, predicate in enumerate(self.predicates)]
+        estimates = [(count, i) for count, i in estimates if count is not None]
+        return self.predicates[min(estimates)[1]] if estimates else None
+
+    def lookup(self, index_of):
+        best = self._best(index_of)
+        return None if best is None else best.lookup(index_of)
+
+    def estimate(self, index_of):
+        best = self._best(index_of)
+        return None if best is None else best.estimate(index_of)
+
+
+class Or(Predicate):
+    def __init__(self, *predicates):
+        self.predicates = predicates
+
+    def match(self, cust):
+        return any(predicate.match(cust) for predicate in self.predicates)
+
+    def mask(self, columns):
+        mask = np.zeros(len(columns), dtype=bool)
+        for predicate in self.predicates:
+            mask |= predicate.mask(columns)
+        return mask
+
+    # Only usable when every child has an index; the union holds each position once
+    def lookup(self, index_of):
+        positions = set()
+        for predicate in self.predicates:
+            candidates = predicate.lookup(index_of)
+            if candidates is None:
+                return None
+            positions.update(candidates)
+        return positions
+
+    def estimate(self, index_of):
+        counts = [predicate.estimate(index_of) for predicate in self.predicates]
+        return None if None in counts else sum(counts)
+
+
+AGGREGATES = ('count', 'sum', 'avg', 'min', 'max')
+
+
+class AmountAggregates:
+    """
+    count / sum / avg / min / max of PurchaseAmount, accumulated in file order.
+    """
+    def __init__(self):
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def add(self, amount):
+        self.count += 1
+        self.sum += amount
+        if self.min is None or amount < self.min:
+            self.min = amount
+        if self.max is None or amount > self.max:
+            self.max = amount
+
+    def result(self, names):
+        values = {'count': self.count, 'sum': self.sum, 'min': self.min, 'max': self.max,
+                  'avg': self.sum / self.count if self.count else 0}
+        return {name: values[name] for name in names}
+
+
+# Define function to project a customer onto the requested fields
+def project(cust, fields):
+    return cust if fields is None else {field: cust[field] for field in fields}
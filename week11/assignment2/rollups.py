@@ -0,0 +1,301 @@
+# Mergeable group-by rollups of PurchaseAmount: per month, per email domain and per recency bucket
+import csv
+import io
+import math
+import os
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+
+from columnar import EPOCH_ORDINAL, np
+from parallel import SHARDS_PER_WORKER, split_byte_ranges
+
+QUANTILE_ALPHA = 0.01  # quantiles are within 1% of a value that is really in the group
+DEFAULT_PERCENTS = (50, 90, 99)
+RECENCY_EDGES = (3, 6, 12, 24)  # months since the last purchase
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of finite non-negative values with relative error alpha (a DDSketch-style
+    log histogram): value v > 0 is counted in bucket ceil(log(v) / log(gamma)), gamma = (1+alpha)/(1-alpha).
+    Merging adds the bucket counts, so sketches of chunks or shards merge into exactly the
+    sketch of the whole input. The number of buckets grows with log(max / min), not with the rows.
+    """
+    def __init__(self, alpha=QUANTILE_ALPHA):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = Counter()  # bucket index -> values
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value):
+        if not 0 <= value < math.inf:
+            raise ValueError(f"QuantileSketch only holds finite non-negative values, got {value}")
+        if value == 0:
+            self.zeros += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+        self.count += 1
+
+    # Define function to add a numpy array of values at once
+    def add_array(self, values):
+        if not np.all((values >= 0) & (values < np.inf)):
+            raise ValueError("QuantileSketch only holds finite non-negative values")
+        positive = values[values > 0]
+        indexes, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+                                    return_counts=True)
+        self.buckets.update(dict(zip(indexes.tolist(), counts.tolist())))
+        self.zeros += len(values) - len(positive)
+        self.count += len(values)
+
+    def merge(self, other):
+        if other.alpha != self.alpha:
+            raise ValueError(f"Cannot merge sketches with alpha {self.alpha} and {other.alpha}")
+        self.buckets.update(other.buckets)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    # Define function to get percentiles (0-100) in one pass over the buckets,
+    # each ranked like numpy.percentile's 'lower' method
+    def percentiles(self, percents):
+        if not self.count:
+            return [None] * len(percents)
+        pending = sorted(((self.count - 1) * percent / 100, i) for i, percent in enumerate(percents))
+        values = [None] * len(percents)
+        seen = 0
+        buckets = [(None, self.zeros)] + sorted(self.buckets.items())  # None stands for the zero bucket
+        for index, count in buckets:
+            seen += count
+            while pending and seen > pending[0][0]:
+                values[pending.pop(0)[1]] = 0.0 if index is None else 2 * self.gamma ** index / (self.gamma + 1)
+            if not pending:
+                break
+        return values
+
+    def percentile(self, percent):
+        return self.percentiles([percent])[0]
+
+
+class GroupState:
+    """
+    count / sum / min / max and a QuantileSketch of the PurchaseAmount of one group.
+    Every part merges by addition, min or max, so the order rows arrive in does not matter
+    (apart from float rounding in sum). NaN amounts are counted and summed, like the average,
+    but left out of min, max and the percentiles, like the sorted indexes. Infinite amounts are
+    counted, summed and can be the min or max, but the percentiles are taken over finite amounts.
+    """
+    def __init__(self, alpha=QUANTILE_ALPHA):
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch(alpha)
+
+    def add(self, amount):
+        self.count += 1
+        self.sum += amount
+        if amount == amount:  # skip NaN
+            if self.min is None or amount < self.min:
+                self.min = amount
+            if self.max is None or amount > self.max:
+                self.max = amount
+            if amount != math.inf:
+                self.sketch.add(amount)
+
+    def add_array(self, amounts):
+        self.count += len(amounts)
+        self.sum += float(amounts.sum())
+        amounts = amounts[amounts == amounts]
+        if len(amounts):
+            low, high = float(amounts.min()), float(amounts.max())
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+            self.sketch.add_array(amounts[amounts != np.inf])
+
+    def merge(self, other):
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    # Define function to get the group's figures; percentiles are clamped to the exact min and max
+    def summary(self, percents=DEFAULT_PERCENTS):
+        result = {'count': self.count, 'sum': self.sum, 'avg': self.sum / self.count if self.count else 0,
+                  'min': self.min, 'max': self.max}
+        for percent, value in zip(percents, self.sketch.percentiles(percents)):
+            result[f'p{percent:g}'] = None if value is None else min(max(value, self.min), self.max)
+        return result
+
+
+# Group keys of one customer dict, and of columns[start:] as (integer codes, code -> key)
+def month_key(cust):
+    date = cust['PurchaseDate']
+    return f"{date.year:04d}-{date.month:02d}"
+
+
+def month_codes(columns, start):
+    months = columns.dates[start:].astype('datetime64[M]').astype(np.int64)
+    return months, lambda code: f"{1970 + code // 12:04d}-{code % 12 + 1:02d}"
+
+
+def domain_key(cust):
+    return cust['Email'].rpartition('@')[2].lower()  # the same domain as query.EmailDomain
+
+
+def domain_codes(columns, start):
+    # Find the domain of each distinct email once, then map the rows through the email codes
+    domains = {}
+    per_email = np.array([domains.setdefault(email.rpartition('@')[2].lower(), len(domains))
+                          for email in columns.emails.values], dtype=np.int64)
+    labels = list(domains)
+    return per_email[np.asarray(columns.emails.codes[start:], dtype=np.intp)], lambda code: labels[code]
+
+
+def day_key(cust):
+    return cust['PurchaseDate']
+
+
+def day_codes(columns, start):
+    days = columns.dates[start:].astype(np.int64)
+    return days, lambda code: datetime.fromordinal(code + EPOCH_ORDINAL)
+
+
+GROUPINGS = {
+    'month': (month_key, month_codes),
+    'domain': (domain_key, domain_codes),
+    'day': (day_key, day_codes),  # recency buckets are merged from the days at report time
+}
+
+
+# Define function to label recency buckets, e.g. (3, 6) -> ['0-3 months', '3-6 months', '6+ months']
+def recency_labels(edges):
+    lows = (0,) + tuple(edges)
+    return [f"{low}-{high} months" for low, high in zip(lows, edges)] + [f"{lows[-1]}+ months"]
+
+
+class Rollups:
+    """
+    Group-by states of PurchaseAmount for every grouping in GROUPINGS, kept up to date row by row.
+    A report reads the states only, so it costs O(groups) however many rows were added.
+    - add(cust) / update(rows): add customer dicts; update also makes Rollups a streaming aggregator
+    - add_columns(columns, start): add the rows columns[start:] of a CustomerColumns, vectorized
+    - merge(other): add the states of rollups built over other rows, e.g. another chunk or shard
+    `size` is the number of rows added, so an owner can catch up with rows appended later.
+    """
+    def __init__(self, groupings=tuple(GROUPINGS), alpha=QUANTILE_ALPHA):
+        for name in groupings:
+            if name not in GROUPINGS:
+                raise ValueError(f"Unknown grouping: {name}. Use one of {', '.join(GROUPINGS)}.")
+        self.groupings = tuple(groupings)
+        self.alpha = alpha
+        self.groups = {name: {} for name in self.groupings}  # grouping -> group key -> GroupState
+        self.size = 0
+
+    def _state(self, name, key):
+        state = self.groups[name].get(key)
+        if state is None:
+            state = self.groups[name][key] = GroupState(self.alpha)
+        return state
+
+    def add(self, cust):
+        amount = cust['PurchaseAmount']
+        for name in self.groupings:
+            self._state(name, GROUPINGS[name][0](cust)).add(amount)
+        self.size += 1
+
+    def update(self, rows):
+        for cust in rows:
+            self.add(cust)
+
+    def add_columns(self, columns, start=0):
+        amounts = columns.amounts[start:]
+        if not len(amounts):
+            return
+        for name in self.groupings:
+            codes, key_of = GROUPINGS[name][1](columns, start)
+            # Sort the rows by group once, then add each group's amounts as one slice
+            order = np.argsort(codes, kind='stable')
+            codes = codes[order]
+            bounds = np.flatnonzero(np.diff(codes)) + 1
+            for code, group in zip(codes[np.concatenate(([0], bounds))].tolist(), np.split(amounts[order], bounds)):
+                self._state(name, key_of(code)).add_array(group)
+        self.size += len(amounts)
+
+    def merge(self, other):
+        if other.groupings != self.groupings:
+            raise ValueError("Cannot merge rollups with different groupings")
+        for name in self.groupings:
+            for key, state in other.groups[name].items():
+                self._state(name, key).merge(state)
+        self.size += other.size
+
+    # Define function to get {group key: summary}, sorted by key
+    def report(self, grouping, percents=DEFAULT_PERCENTS):
+        if grouping not in self.groups:
+            raise ValueError(f"Unknown grouping: {grouping}. Use one of {', '.join(self.groupings)}.")
+        return {key: self.groups[grouping][key].summary(percents) for key in sorted(self.groups[grouping])}
+
+    # Define function to get {bucket label: summary} by months since the purchase
+    def recency(self, edges=RECENCY_EDGES, percents=DEFAULT_PERCENTS, now=None):
+        """
+        Bucket 'a-b months' holds the purchases made at least a but less than b months before now,
+        the same customers as CustomerManager.find_inactive_between(a, b); the last bucket
+        holds the purchases made edges[-1] or more months ago. Built from the 'day' groups.
+        """
+        if 'day' not in self.groups:
+            raise ValueError("Recency buckets need the 'day' grouping.")
+        now = now or datetime.now()
+        cutoffs = [now - relativedelta(months=months) for months in reversed(edges)]  # oldest first
+        buckets = [GroupState(self.alpha) for _ in range(len(edges) + 1)]
+        for day, state in self.groups['day'].items():
+            buckets[len(edges) - bisect_right(cutoffs, day)].merge(state)
+        return {label: bucket.summary(percents) for label, bucket in zip(recency_labels(edges), buckets)}
+
+
+# Worker: validate one byte range of the CSV and roll up its valid rows
+def rollup_shard(filepath, fieldnames, start, end, validate, groupings):
+    """
+    Returns (rollups, errors) where errors is a list of (row, error_message) in file order.
+    Only the group states travel back to the parent process, not the rows.
+    """
+    with open(filepath, mode='rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    rollups = Rollups(groupings)
+    errors = []
+    for row in csv.DictReader(io.StringIO(text, newline=''), fieldnames=fieldnames):
+        try:
+            validate(row)
+        except Exception as e:
+            errors.append((row, str(e)))
+            continue
+        rollups.add(row)
+    return rollups, errors
+
+
+# Define function to roll up a CSV file across a process pool, without keeping its rows
+def rollup_parallel(filepath, validate, workers=None, groupings=tuple(GROUPINGS), on_error=None):
+    """
+    Splits filepath like parallel.validate_parallel, builds one Rollups per shard in the workers
+    and merges them. on_error(row, error_message) is called for rejected rows, in file order.
+    Returns the merged Rollups.
+    """
+    workers = workers or os.cpu_count() or 1
+    fieldnames, ranges = split_byte_ranges(filepath, workers * SHARDS_PER_WORKER)
+    rollups = Rollups(groupings)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(rollup_shard, filepath, fieldnames, start, end, validate, groupings)
+                   for start, end in ranges]
+        for future in futures:
+            shard, errors = future.result()
+            rollups.merge(shard)
+            if on_error is not None:
+                for row, error in errors:
+                    on_error(row, error)
+    return rollups
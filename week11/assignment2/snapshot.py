@@ -0,0 +1,121 @@
+# On-disk snapshot of validated customer columns, stored next to the source CSV
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from columnar import CustomerColumns, np
+
+SNAPSHOT_VERSION = 2
+# Coarsest file timestamp resolution we allow for (FAT stores mtimes in 2 second steps). A file modified
+# this close to the moment its key was taken may change again without its mtime moving.
+MTIME_GRANULARITY_NS = 2 * 10**9
+ARRAYS = ('ids', 'amounts', 'dates', 'name_codes', 'email_codes')
+
+
+# Define function to get the snapshot directory of a CSV file
+def snapshot_path(filepath):
+    return filepath + '.snapshot'
+
+
+# Define function to hash the CSV content
+def content_hash(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, mode='rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Define function to describe the current state of the source CSV
+def source_key(filepath, with_hash=True):
+    taken_ns = time.time_ns()
+    stat = os.stat(filepath)
+    key = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'taken_ns': taken_ns}
+    if with_hash:
+        key['sha256'] = content_hash(filepath)
+    return key
+
+
+# Define function to check whether a snapshot still describes the source CSV
+def is_current(filepath, saved):
+    """
+    Same size and mtime: current without reading the CSV, unless the mtime was within
+    MTIME_GRANULARITY_NS of the moment the key was taken; a write in that window can leave the
+    mtime unchanged, so such ("racy") keys are always checked against the content hash.
+    Same size but different mtime (copied or touched file): current only if the content hash matches.
+    So a same-size rewrite that also restores the old mtime (e.g. touch -r) is not detected.
+    """
+    current = source_key(filepath, with_hash=False)
+    if current['size'] != saved['size']:
+        return False
+    racy = saved.get('taken_ns', 0) - saved['mtime_ns'] < MTIME_GRANULARITY_NS
+    if current['mtime_ns'] == saved['mtime_ns'] and not racy:
+        return True
+    return content_hash(filepath) == saved['sha256']
+
+
+# Define function to save validated columns and rejected-row messages
+def write_snapshot(filepath, columns, rejected, source):
+    """
+    Writes every column as a .npy file plus meta.json (source key, string tables, rejected rows)
+    into a temporary directory, then moves it into place so readers never see a half-written snapshot.
+    source is the source_key taken before the CSV was parsed. If the CSV changed since
+    (e.g. an export still being written), nothing is saved and ValueError is raised,
+    so the snapshot never pairs the rows of one version with the key of another.
+    """
+    target = snapshot_path(filepath)
+    temporary = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+    try:
+        arrays = {
+            'ids': columns.ids,
+            'amounts': columns.amounts,
+            'dates': columns.dates,
+            'name_codes': np.asarray(columns.names.codes, dtype=np.int32),
+            'email_codes': np.asarray(columns.emails.codes, dtype=np.int32),
+        }
+        for name in ARRAYS:
+            np.save(os.path.join(temporary, f"{name}.npy"), arrays[name])
+        meta = {
+            'version': SNAPSHOT_VERSION,
+            'source': source,
+            'names': columns.names.values,
+            'emails': columns.emails.values,
+            'id_texts': columns.id_texts,
+            'rejected': rejected,
+        }
+        with open(os.path.join(temporary, 'meta.json'), mode='w', encoding='utf-8') as file:
+            json.dump(meta, file)
+        current = source_key(filepath, with_hash=False)
+        if (current['size'], current['mtime_ns']) != (source['size'], source['mtime_ns']):
+            raise ValueError(f"{filepath} changed while it was being loaded")
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(temporary, target)
+    except Exception:
+        shutil.rmtree(temporary, ignore_errors=True)
+        raise
+
+
+# Define function to map a snapshot back into columns
+def read_snapshot(filepath):
+    """
+    Returns (columns, rejected) with the numeric columns memory-mapped read-only,
+    or None if there is no snapshot or the source CSV has changed since it was written.
+    """
+    target = snapshot_path(filepath)
+    try:
+        with open(os.path.join(target, 'meta.json'), mode='r', encoding='utf-8') as file:
+            meta = json.load(file)
+        if meta.get('version') != SNAPSHOT_VERSION or not is_current(filepath, meta['source']):
+            return None
+        arrays = {name: np.load(os.path.join(target, f"{name}.npy"), mmap_mode='r') for name in ARRAYS}
+    except (OSError, ValueError, KeyError):
+        return None
+    columns = CustomerColumns.from_arrays(arrays['ids'], arrays['amounts'], arrays['dates'],
+                                          meta['names'], arrays['name_codes'],
+                                          meta['emails'], arrays['email_codes'],
+                                          {int(position): text for position, text in meta['id_texts'].items()})
+    return columns, meta['rejected']
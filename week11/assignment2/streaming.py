@@ -0,0 +1,87 @@
+# Chunked CSV reading and single-pass aggregators for files larger than memory
+import csv
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+# Define function to read a CSV file as fixed-size lists of row dicts
+def read_chunks(filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+    with open(filepath, mode='r', newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                break
+            yield chunk
+
+
+# Define function to push every chunk through validation and then through each aggregator
+def stream_rows(filepath, validate, aggregators, chunk_size=DEFAULT_CHUNK_SIZE, on_error=None):
+    """
+    Reads filepath chunk by chunk, so only one chunk of rows is held at a time.
+    - validate(row): converts the row in place and raises on invalid data.
+    - aggregators: objects with an update(rows) method, fed each chunk of valid rows.
+    - on_error(row, error): called for rejected rows. If None, the error is raised.
+    Returns a tuple (rows_loaded, rows_rejected).
+    """
+    rows_loaded = 0
+    rows_rejected = 0
+    for chunk in read_chunks(filepath, chunk_size):
+        valid_rows = []
+        for row in chunk:
+            try:
+                validate(row)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(row, e)
+                rows_rejected += 1
+                continue
+            valid_rows.append(row)
+        for aggregator in aggregators:
+            aggregator.update(valid_rows)
+        rows_loaded += len(valid_rows)
+    return rows_loaded, rows_rejected
+
+
+class FilterAggregator:
+    """
+    Keeps the rows matching predicate, in file order.
+    When on_match is given, each match is handed over instead of being stored,
+    so memory stays constant however many rows match.
+    """
+    def __init__(self, predicate, on_match=None):
+        self.predicate = predicate
+        self.on_match = on_match
+        self.matches = []
+        self.count = 0
+
+    def update(self, rows):
+        for row in rows:
+            if self.predicate(row):
+                self.count += 1
+                if self.on_match is not None:
+                    self.on_match(row)
+                else:
+                    self.matches.append(row)
+
+
+class AverageAggregator:
+    """
+    Running total and count of one numeric field.
+    Values are added one by one in file order, which gives the same float as sum() over the full list.
+    """
+    def __init__(self, field='PurchaseAmount'):
+        self.field = field
+        self.total = 0
+        self.count = 0
+
+    def update(self, rows):
+        for row in rows:
+            self.total += row[self.field]
+            self.count += 1
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0
@@ -0,0 +1,101 @@
+# Buffered, atomic CSV export for customer rows
+import csv
+import gzip
+import os
+import stat
+import tempfile
+from itertools import islice
+
+try:
+    import zstandard
+except ImportError:  # zstandard is only needed for compression='zstd'
+    zstandard = None
+
+FIELDS = ['CustomerID', 'Name', 'Email', 'PurchaseAmount', 'PurchaseDate']
+BATCH_SIZE = 10000
+BUFFER_SIZE = 1 << 20  # 1 MiB file buffer, so batches reach the disk in large writes
+
+
+# Define function to open the temporary output file with the requested compression
+def _open_output(path, compression):
+    if compression is None:
+        return open(path, mode='w', newline='', encoding='utf-8', buffering=BUFFER_SIZE)
+    if compression == 'gzip':
+        return gzip.open(path, mode='wt', newline='', encoding='utf-8')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("compression='zstd' requires zstandard. Please install it with 'pip install zstandard'.")
+        return zstandard.open(path, mode='wt', newline='', encoding='utf-8')
+    raise ValueError(f"Unknown compression: {compression}. Use None, 'gzip' or 'zstd'.")
+
+
+# Define function to read the process umask without changing it where the OS reports it (Linux /proc);
+# elsewhere it is set and restored once, at import, instead of on every write
+def _read_umask():
+    try:
+        with open('/proc/self/status', encoding='ascii') as status:
+            for line in status:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+DEFAULT_MODE = 0o666 & ~_read_umask()  # the mode open() gives a new file
+
+
+# Define function to get the file mode a normal open() would have left output_file with:
+# an existing file keeps its mode, a new one gets DEFAULT_MODE
+def _output_mode(output_file):
+    try:
+        return stat.S_IMODE(os.stat(output_file).st_mode)
+    except FileNotFoundError:
+        return DEFAULT_MODE
+
+
+# Define function to write customers to a CSV file in large batches
+def write_customers_csv(output_file, customers, compression=None, batch_size=BATCH_SIZE):
+    """
+    Writes customers (any iterable, e.g. a generator from CustomerManager.iter_query) to output_file.
+    The output is byte-for-byte what csv.DictWriter produced row by row, but:
+    - rows are formatted as tuples and written with writerows in batches of batch_size
+    - PurchaseDate strings are formatted once per distinct date
+    - the file is written to a temporary file in the same directory and renamed into place,
+      so a crash never leaves a half-written output_file
+    - compression may be None, 'gzip' or 'zstd'
+    Returns the number of rows written.
+    """
+    dates = {}  # datetime -> 'YYYY-MM-DD'
+
+    def format_date(purchase_date):
+        text = dates.get(purchase_date)
+        if text is None:
+            text = dates[purchase_date] = purchase_date.date().isoformat()
+        return text
+
+    rows = ((cust['CustomerID'], cust['Name'], cust['Email'], cust['PurchaseAmount'],
+             format_date(cust['PurchaseDate'])) for cust in customers)
+
+    directory = os.path.dirname(os.path.abspath(output_file))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(output_file) + '.')
+    os.close(handle)
+    count = 0
+    try:
+        with _open_output(temporary, compression) as file:
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                writer.writerows(batch)
+                count += len(batch)
+        os.chmod(temporary, _output_mode(output_file))
+        os.replace(temporary, output_file)
+    except BaseException:
+        os.remove(temporary)
+        raise
+    return count
@@ -1,23 +1,9 @@
-# Define draw_grid function that takes two arguments
-def draw_grid(rows, cols):
+from grid import render_grid
 
-    # Draw horizonal line
-    def draw_horizontal():
-        print('*', end='')
-        for _ in range(cols):
-            print('~' * 4, end='*')
-        print()
+# Define draw_grid function that takes the grid size, and optionally where to write it
+def draw_grid(rows, cols, file=None, **style):
 
-    # Draw vertical line
-    def draw_vertical():
-        for _ in range(2):
-            print('|', end='')
-            for _ in range(cols):
-                print(' ' * 4, end='|')
-            print()
-            
-    # Draw the grid
-    for _ in range(rows):
-        draw_horizontal()
-        draw_vertical()
-    draw_horizontal()
+    # Draw the grid with '*' corners and '~' borders, building each line once
+    # and writing in large chunks instead of one print per cell
+    # style may change corner, horizontal, vertical, fill, cell_width or cell_height
+    render_grid(rows, cols, file, **dict(corner='*', horizontal='~') | style)
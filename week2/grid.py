@@ -0,0 +1,29 @@
+# Grid rendering shared by draw_grid.py and print_text.py
+import sys
+
+CHUNK_SIZE = 1 << 20 # characters per write, so big grids take a few large writes instead of one per cell
+
+# Define generator that yields the grid text in large chunks
+def iter_grid(rows, cols, corner='+', horizontal='-', vertical='|', fill=' ',
+              cell_width=4, cell_height=2, chunk_size=CHUNK_SIZE):
+    # Each distinct line is built once: the border line and the cell line
+    border_line = corner + (horizontal * cell_width + corner) * cols + '\n'
+    cell_line = vertical + (fill * cell_width + vertical) * cols + '\n'
+    # One grid row is a border line followed by the cell lines
+    grid_row = border_line + cell_line * cell_height
+
+    # Repeat whole grid rows up to about chunk_size characters per chunk
+    rows_per_chunk = max(1, chunk_size // len(grid_row))
+    chunk = grid_row * min(rows_per_chunk, rows)
+    for _ in range(rows // rows_per_chunk):
+        yield chunk
+    if rows % rows_per_chunk:
+        yield grid_row * (rows % rows_per_chunk)
+    yield border_line # the bottom line
+
+# Define function to write a grid to a file-like object (the screen by default)
+def render_grid(rows, cols, file=None, **style):
+    if file is None:
+        file = sys.stdout
+    for chunk in iter_grid(rows, cols, **style):
+        file.write(chunk)